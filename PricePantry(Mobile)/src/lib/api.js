@@ -120,6 +120,19 @@ export const api = {
     }
   },
 
+  // Get a product's price history (list payloads leave it out)
+  async getProductHistory(productId) {
+    try {
+      const response = await fetch(`${API_BASE_URL}/products/${productId}/history`);
+      if (!response.ok) throw new Error('Price history not found');
+      const data = await response.json();
+      return data.history || [];
+    } catch (error) {
+      console.error('Price history error:', error);
+      return [];
+    }
+  },
+
   // Get search suggestions
   async getSuggestions(query) {
     try {
@@ -25,6 +25,7 @@ export default function ProductDetailScreen() {
   const { isFavorite, toggleFavorite } = useFavorites();
   const { addItem } = useShoppingList();
   const [product, setProduct] = useState(route.params?.product);
+  const [priceHistory, setPriceHistory] = useState(route.params?.product?.price_history || []);
 
   useEffect(() => {
     if (route.params?.productId && !product) {
@@ -32,6 +33,22 @@ export default function ProductDetailScreen() {
     }
   }, [route.params]);
 
+  // Search and list results come without price_history; fetch it for the chart
+  useEffect(() => {
+    if (!product) return;
+    if (product.price_history) {
+      setPriceHistory(product.price_history);
+      return;
+    }
+    let cancelled = false;
+    api.getProductHistory(product.id).then((history) => {
+      if (!cancelled) setPriceHistory(history);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [product?.id]);
+
   const loadProduct = async (productId) => {
     const data = await api.getProduct(productId);
     if (data) setProduct(data);
@@ -45,7 +62,6 @@ export default function ProductDetailScreen() {
     );
   }
 
-  const priceHistory = product.price_history || [];
   const prices = priceHistory.map(p => p.price);
   const labels = priceHistory.map((p, i) => i % 5 === 0 ? new Date(p.date).getDate().toString() : '');
 
@@ -0,0 +1,90 @@
+"""Alert checker throughput against a local mongod: per-alert writes vs streaming + bulk_write.
+
+Needs a running mongod at MONGO_URL (default mongodb://localhost:27017).
+Everything happens in a scratch database, which is dropped afterwards.
+Inserts --alerts untriggered alerts, a third of which are at or above
+their product's price, then times two checkers:
+- per-alert: to_list() everything, then one update_one round trip per
+  fired alert (the original pattern, without its 100-alert cap)
+- streaming: check_price_alerts_and_notify, i.e. a batch_size cursor into
+  AlertEngine.reload plus unordered bulk_write batches
+Emails are off (no addresses), so only Mongo work is measured.
+
+    python benchmarks/bench_alert_checker.py --alerts 100000
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+
+import stub_store  # noqa: F401  (sets up env and import path)
+import server
+
+
+def make_alerts(n: int, seed: int = 5):
+    rng = random.Random(seed)
+    alerts = []
+    for i in range(n):
+        ordinal = rng.randrange(len(server.catalog.products))
+        price, _ = server.catalog.best_price(ordinal)
+        fires = i % 3 == 0 and price != float('inf')
+        alerts.append({
+            "id": f"bench-{i}", "product_id": server.catalog.products[ordinal]["id"], "product_name": "bench",
+            "target_price": price + 1 if fires else 0.01, "current_best_price": price, "email": None, "triggered": False,
+        })
+    return alerts
+
+
+async def per_alert_checker():
+    alerts = await server.db.price_alerts.find({"triggered": False}, {"_id": 0}).to_list(None)
+    for alert in alerts:
+        ordinal = server.catalog.ordinal(alert["product_id"])
+        price, _ = server.catalog.best_price(ordinal)
+        if price <= alert["target_price"]:
+            await server.db.price_alerts.update_one(
+                {"id": alert["id"]},
+                {"$set": {"triggered": True, "triggered_at": datetime.now(timezone.utc).isoformat()}},
+            )
+    return len(alerts)
+
+
+async def streaming_checker():
+    await server.check_price_alerts_and_notify()
+    await server.alert_engine.drain()
+
+
+async def reset(alerts):
+    await server.db.price_alerts.delete_many({})
+    for start in range(0, len(alerts), 10_000):
+        await server.db.price_alerts.insert_many([dict(alert) for alert in alerts[start:start + 10_000]])
+    await server.db.price_alerts.create_index("id")
+    await server.db.price_alerts.create_index("triggered")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alerts", type=int, default=100_000)
+    parser.add_argument("--database", default="pricepantry_alert_bench")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    server.db = server.client[args.database]
+    alerts = make_alerts(args.alerts)
+    expected = sum(1 for alert in alerts if alert["target_price"] > 0.01)
+    try:
+        for label, checker in [("per-alert update_one", per_alert_checker), ("stream + bulk_write", streaming_checker)]:
+            await reset(alerts)
+            started = time.perf_counter()
+            await checker()
+            elapsed = time.perf_counter() - started
+            triggered = await server.db.price_alerts.count_documents({"triggered": True})
+            assert triggered == expected, (label, triggered, expected)
+            print(f"{label:<22} {args.alerts} alerts ({triggered} fired) in {elapsed:.2f}s = {args.alerts / elapsed:,.0f} alerts/sec")
+    finally:
+        await server.client.drop_database(args.database)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Autocomplete keystroke replay: scan-and-stop vs the sorted prefix index.
+
+Types product names one character at a time, as the search box does, and
+times each suggestions lookup. The baseline is the original handler loop
+(scan products until 8 name matches); the index is
+AutocompleteIndex.complete. Reports p50/p99 per keystroke, then the
+first lookup after each of --price-changes single-product price changes
+(catalog.upsert reprices the index in place) and checks the repriced
+index returns what a fresh build would.
+
+    python benchmarks/bench_autocomplete.py
+"""
+import argparse
+import copy
+import random
+import statistics
+import time
+
+from synthetic_catalog import make_products
+import server
+
+TYPED = ["bananas", "devondale milk", "peanut butter", "kalo", "zelbra", "shampoo", "xyz"]
+
+
+def scan_suggestions(products, q):
+    q_lower = q.lower()
+    suggestions = []
+    for p in products:
+        if q_lower in p["name"].lower():
+            suggestions.append(p["name"])
+            if len(suggestions) >= 8:
+                break
+    return suggestions
+
+
+def keystrokes(words):
+    return [word[:i] for word in words for i in range(1, len(word) + 1)]
+
+
+def replay(fn, typed, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        for prefix in typed:
+            started = time.perf_counter()
+            fn(prefix)
+            samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def after_price_changes(catalog, typed, changes: int):
+    rng = random.Random(3)
+    samples = []
+    for i in range(changes):
+        product = copy.deepcopy(catalog.products[rng.randrange(len(catalog.products))])
+        for offer in product["store_prices"].values():
+            offer["price"] = round(rng.uniform(0.5, 30), 2)
+        catalog.upsert(product)
+        started = time.perf_counter()
+        catalog.autocomplete.complete(typed[i % len(typed)], 8, "price")
+        samples.append((time.perf_counter() - started) * 1e6)
+    repriced = {(q, rank): catalog.autocomplete.complete(q, 8, rank) for q in typed for rank in ("popularity", "price")}
+    catalog.autocomplete.build()
+    rebuilt = {(q, rank): catalog.autocomplete.complete(q, 8, rank) for q in typed for rank in ("popularity", "price")}
+    assert repriced == rebuilt, "repriced index differs from a fresh build"
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--price-changes", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        catalog_started = time.perf_counter()
+        catalog = server.ProductCatalog(make_products(size))
+        build = time.perf_counter() - catalog_started
+        rng = random.Random(7)
+        for _ in range(size // 10):
+            catalog.views[rng.randrange(size)] += 1
+        typed = keystrokes(TYPED)
+        scan_p50, scan_p99 = replay(lambda q: scan_suggestions(catalog.products, q), typed, args.repeat)
+        for rank in ("popularity", "price"):
+            catalog.autocomplete.mark_dirty()
+            catalog.autocomplete.build()
+            p50, p99 = replay(lambda q: catalog.autocomplete.complete(q, 8, rank), typed, args.repeat)
+            print(f"{size:>7} products ({rank:>10}): scan p50={scan_p50:.0f}us p99={scan_p99:.0f}us  "
+                  f"index p50={p50:.0f}us p99={p99:.0f}us  (catalog build {build * 1000:.0f}ms)")
+        p50, p99 = after_price_changes(catalog, typed, args.price_changes)
+        print(f"{size:>7} products: first lookup after a price change p50={p50:.0f}us p99={p99:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Deep pages of /api/products/search: page= offsets vs keyset cursors.
+
+Walks a 100k-product catalog with page_size=20, once with page= and once by
+following next_cursor. Reports the time per page at several depths. An
+offset page filters the whole sorted view before slicing. A cursor page
+seeks to its position and scans only as far as one page needs. Text
+searches (q=) resume from the cached ordered matches instead of searching
+again. Checks that each cursor page matches the offset page at its depth.
+
+    python benchmarks/bench_cursor_pagination.py
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import orjson
+
+from synthetic_catalog import make_products
+import server
+
+DEPTHS = [1, 10, 100, 1000]
+
+
+async def fetch(**params):
+    query = dict(q="", category=None, store=None, min_price=None, max_price=None, sort_by="best_price",
+                 page=1, page_size=20, fuzzy=False, fields="name", cursor=None)
+    query.update(params)
+    response = await server.search_products(**query)
+    return orjson.loads(response.body)
+
+
+async def time_ms(repeat: int, **params) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fetch(**params)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    server.catalog = server.ProductCatalog(make_products(args.products))
+    for label, filters in [("sort=best_price", {}), ("sort=name", {"sort_by": "name"}),
+                           ("aldi, sort=best_price", {"store": "aldi"}),
+                           ("q=milk, sort=best_price", {"q": "milk"}), ("q=milk, sort=name", {"q": "milk", "sort_by": "name"})]:
+        # Walk the cursor chain once to get the cursor that leads to each depth
+        cursors, cursor = {1: None}, None
+        for page in range(1, max(DEPTHS)):
+            cursor = (await fetch(cursor=cursor, **filters))["next_cursor"]
+            if cursor is None:
+                break
+            cursors[page + 1] = cursor
+        for depth in DEPTHS:
+            if depth not in cursors:
+                continue
+            by_offset = (await fetch(page=depth, **filters))["products"]
+            assert by_offset == (await fetch(cursor=cursors[depth], **filters))["products"], (label, depth)
+            offset = await time_ms(args.repeat, page=depth, **filters)
+            keyset = await time_ms(args.repeat, cursor=cursors[depth], **filters)
+            print(f"{label:<24} page {depth:>4}: page= {offset:.2f}ms  cursor {keyset:.2f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""Alert email throughput offline: serial sends vs the EmailDispatcher.
+
+Uses FakeEmailTransport, which blocks --latency seconds per API call, as
+the Resend SDK does. --alerts triggered alerts are spread over --recipients
+addresses and sent two ways:
+- serial: one blocking send per alert, awaited one at a time (the original loop)
+- dispatcher: per-recipient digests, batch calls, bounded concurrency
+Checks that every recipient got exactly one email from the dispatcher.
+
+    python benchmarks/bench_email_dispatch.py
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import stub_store  # noqa: F401  (sets up env and import path)
+import server
+from fake_email import FakeEmailTransport
+
+
+def make_notifications(alerts: int, recipients: int):
+    rng = random.Random(9)
+    return [
+        {"alert_id": f"alert-{i}", "email": f"user{rng.randrange(recipients)}@example.com", "product_name": f"Product {i}",
+         "target_price": 5.0, "current_price": 4.5, "store_name": "Coles"}
+        for i in range(alerts)
+    ]
+
+
+async def serial(transport, notifications):
+    for item in notifications:
+        params = server.render_price_alert_email(item["email"], item["product_name"], item["target_price"],
+                                                 item["current_price"], item["store_name"])
+        await asyncio.to_thread(transport.send, params)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alerts", type=int, default=500)
+    parser.add_argument("--recipients", type=int, default=150)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=server.EMAIL_MAX_CONCURRENCY)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    notifications = make_notifications(args.alerts, args.recipients)
+    recipients = {item["email"] for item in notifications}
+
+    transport = FakeEmailTransport(args.latency)
+    started = time.perf_counter()
+    await serial(transport, notifications)
+    serial_s = time.perf_counter() - started
+    print(f"serial:     {args.alerts} alerts -> {len(transport.sent)} emails, {transport.calls} API calls in {serial_s:.2f}s "
+          f"({args.alerts / serial_s:,.0f} alerts/sec)")
+
+    transport = FakeEmailTransport(args.latency)
+    dispatcher = server.EmailDispatcher(transport, max_concurrency=args.concurrency)
+    started = time.perf_counter()
+    results = await dispatcher.dispatch(notifications)
+    dispatch_s = time.perf_counter() - started
+    assert all(results.values()) and len(results) == args.alerts
+    assert sorted(message["to"][0] for message in transport.sent) == sorted(recipients)
+    print(f"dispatcher: {args.alerts} alerts -> {len(transport.sent)} emails, {transport.calls} API calls in {dispatch_s:.2f}s "
+          f"({args.alerts / dispatch_s:,.0f} alerts/sec)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+"""Parsing throughput (pages/sec) of the fast lxml extractor vs BeautifulSoup.
+
+Runs each extractor over the saved search-page fixtures and checks that both
+produce the same products before timing them.
+
+    python benchmarks/bench_extractors.py --seconds 3
+"""
+import argparse
+import time
+from pathlib import Path
+
+import stub_store  # noqa: F401  (sets up env and import path)
+import server
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+CASES = [
+    ("coles", FIXTURES / "coles_search.html", server.COLES_EXTRACTOR.extract, server.parse_coles_html_soup),
+    ("woolworths", FIXTURES / "woolworths_search.html", server.WOOLWORTHS_EXTRACTOR.extract, server.parse_woolworths_html_soup),
+]
+
+
+def throughput(parse, html: str, seconds: float) -> float:
+    pages = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        parse(html)
+        pages += 1
+    return pages / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    for store, path, fast, soup in CASES:
+        html = path.read_text()
+        assert fast(html) == soup(html), f"{store}: fast and soup extractors disagree"
+        fast_rate = throughput(fast, html, args.seconds)
+        soup_rate = throughput(soup, html, args.seconds)
+        print(f"{store:>10} ({len(html) // 1024} KB): fast={fast_rate:.1f} pages/s "
+              f"soup={soup_rate:.1f} pages/s speedup={fast_rate / soup_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
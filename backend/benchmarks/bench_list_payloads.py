@@ -0,0 +1,72 @@
+"""List payload size and serialisation time: full products vs summaries.
+
+Serialises one search page and one specials listing three ways:
+- full: Product models including the 31-point price_history (the old payload)
+- summary: ProductSummary, i.e. everything but price_history (the new default)
+- fields=: a narrow fields= projection
+Search pages go through pydantic, validate plus dump, as FastAPI does for
+response_model. Specials are plain json.dumps, as the response cache does.
+
+    python benchmarks/bench_list_payloads.py
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from pydantic import BaseModel
+
+from synthetic_catalog import make_products
+import server
+
+
+class FullProductResponse(BaseModel):
+    products: List[server.Product]
+    total: int
+    page: int
+    page_size: int
+    source: str = "mock"
+
+
+def search_page(products, model, fields=None) -> bytes:
+    page = products if fields is None else server.project(products, fields)
+    response = model.model_validate({"products": page, "total": 1000, "page": 1, "page_size": len(page), "source": "mock"})
+    return response.model_dump_json(exclude_unset=fields is not None).encode()
+
+
+def listing(products, fields=None) -> bytes:
+    page = products if fields is None else server.project(products, fields)
+    return json.dumps({"products": page}, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def measure(fn, repeat: int):
+    body = fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return len(body), (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    products = make_products(args.page_size, history=True)
+    narrow = server.parse_fields("name,brand,store_prices")
+    cases = [
+        ("search full", lambda: search_page(products, FullProductResponse)),
+        ("search summary", lambda: search_page(products, server.ProductResponse, server.SUMMARY_FIELDS)),
+        ("search fields=", lambda: search_page(products, server.ProductResponse, narrow)),
+        ("specials full", lambda: listing(products)),
+        ("specials summary", lambda: listing(products, server.SUMMARY_FIELDS)),
+        ("specials fields=", lambda: listing(products, narrow)),
+    ]
+    for label, fn in cases:
+        size, ms = measure(fn, args.repeat)
+        print(f"{label:<17} {args.page_size} products: {size / 1024:>7.1f} KiB  {ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Specials and category listings: rebuilt per request vs the versioned response cache.
+
+The endpoints run in-process through httpx's ASGI transport against a
+synthetic catalog, in three modes:
+- rebuild: catalog.version is bumped before every request, so each body is rebuilt
+- cached: the same catalog version every time, so the pre-serialised body is served
+- 304: the client sends back the ETag it was given
+
+    python benchmarks/bench_list_responses.py
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from synthetic_catalog import make_products
+import server
+
+PATHS = ["/api/specials?limit=50", "/api/products/category/{category}?limit=50"]
+
+
+async def run(path: str, requests: int, mode: str) -> float:
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        etag = (await http.get(path)).headers["etag"]
+        headers = {"If-None-Match": etag} if mode == "304" else {}
+        expected = 304 if mode == "304" else 200
+        started = time.perf_counter()
+        for _ in range(requests):
+            if mode == "rebuild":
+                server.catalog.version += 1
+            response = await http.get(path, headers=headers)
+            assert response.status_code == expected, response.status_code
+        return requests / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    server.catalog = server.ProductCatalog(make_products(args.products, history=True))
+    category = server.catalog.products[0]["category"]
+    for template in PATHS:
+        path = template.format(category=category)
+        rates = {mode: await run(path, args.requests, mode) for mode in ("rebuild", "cached", "304")}
+        print(f"{path:<45} " + "  ".join(f"{mode}={rate:.0f} req/s" for mode, rate in rates.items()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
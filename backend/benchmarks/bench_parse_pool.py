@@ -0,0 +1,70 @@
+"""Event-loop lag during parallel scrapes, with and without the parse pool.
+
+A ticker coroutine asks to wake every 5 ms and records how late it actually
+wakes; while BeautifulSoup runs on the loop, every other request waits the
+same way. Each mode runs --rounds of --parallel concurrent uncached scrapes
+against the stub store serving ~--page-kb KB pages.
+
+    python benchmarks/bench_parse_pool.py --parallel 4 --rounds 3
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from stub_store import StubStore, store_page
+import server
+
+TICK = 0.005
+
+
+async def ticker(lags, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append((time.perf_counter() - started - TICK) * 1000)
+
+
+async def run(mode: str, parallel: int, rounds: int):
+    server.parse_pool.shutdown()
+    server.parse_pool = server.ParsePool(kind=mode)
+    server.price_cache.clear()
+    lags = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, stop))
+
+    started = time.perf_counter()
+    for r in range(rounds):
+        await asyncio.gather(*(server.scrape_all_stores(f"{mode}-{r}-{i}") for i in range(parallel)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await tick_task
+    lags.sort()
+    print(f"{mode:>8}: wall={elapsed:.2f}s loop lag p50={lags[len(lags) // 2]:.1f}ms "
+          f"p99={lags[int(len(lags) * 0.99)]:.1f}ms max={lags[-1]:.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--page-kb", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    # ~90 bytes per filler element
+    stub = await StubStore(tiles=48, padding=args.page_kb * 1024 // 90).start()
+    stub.point_stores_here(server)
+    print(f"page size ~{len(store_page('coles', 'x', stub.tiles, stub.padding)) // 1024} KB")
+    try:
+        for mode in ("none", "thread", "process"):
+            await run(mode, args.parallel, args.rounds)
+    finally:
+        server.parse_pool.shutdown()
+        await server.scraper_clients.close()
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""Catalog-wide queries: walking store_prices dicts vs the columnar PriceMatrix.
+
+The baseline is the original dict-walking code. It recomputes each
+product's best price from store_prices, filters, sorts everything, and
+scans for specials and categories. The columnar path uses ProductCatalog.select
+and PriceMatrix.price_range, which are vectorised masks plus a
+binary-searched price order. Only the returned page is turned back into
+product dicts. Each case checks both paths return the same page.
+
+    python benchmarks/bench_price_matrix.py
+"""
+import argparse
+import time
+
+import numpy as np
+
+from synthetic_catalog import make_products
+import server
+
+
+def get_best_price(p):
+    prices = [sp["price"] for sp in p.get("store_prices", {}).values() if sp.get("available") and sp.get("price", 0) > 0]
+    return min(prices) if prices else float('inf')
+
+
+def dict_price_page(products, min_price, max_price, store, page_size=20):
+    filtered = products.copy()
+    if store:
+        filtered = [p for p in filtered if p.get("store_prices", {}).get(store, {}).get("available", False)]
+    if min_price is not None:
+        filtered = [p for p in filtered if get_best_price(p) >= min_price]
+    if max_price is not None:
+        filtered = [p for p in filtered if get_best_price(p) <= max_price]
+    filtered.sort(key=get_best_price)
+    return len(filtered), filtered[:page_size]
+
+
+def columnar_price_page(catalog, min_price, max_price, store, page_size=20):
+    ordinals = catalog.prices.price_range(min_price, max_price)
+    if store:
+        ordinals = ordinals[catalog.select(store=store)[ordinals]]
+    return len(ordinals), catalog.page(ordinals, limit=page_size)
+
+
+def dict_specials(products, limit=50):
+    specials = [p for p in products if any(sp.get("on_special") for sp in p["store_prices"].values())]
+    return len(specials), specials[:limit]
+
+
+def columnar_specials(catalog, limit=50):
+    ordinals = np.flatnonzero(catalog.select(on_special=True))
+    return len(ordinals), catalog.page(ordinals, limit=limit)
+
+
+def dict_category(products, category, limit=50):
+    matches = [p for p in products if p["category"] == category]
+    return len(matches), matches[:limit]
+
+
+def columnar_category(catalog, category, limit=50):
+    ordinals = np.flatnonzero(catalog.select(category=category))
+    return len(ordinals), catalog.page(ordinals, limit=limit)
+
+
+def time_ms(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        catalog = server.ProductCatalog(make_products(size))
+        category = catalog.products[0]["category"]
+        cases = [
+            ("sort by price", lambda: dict_price_page(catalog.products, None, None, None),
+             lambda: columnar_price_page(catalog, None, None, None)),
+            ("$3-$6", lambda: dict_price_page(catalog.products, 3.0, 6.0, None),
+             lambda: columnar_price_page(catalog, 3.0, 6.0, None)),
+            ("under $2 at aldi", lambda: dict_price_page(catalog.products, None, 2.0, "aldi"),
+             lambda: columnar_price_page(catalog, None, 2.0, "aldi")),
+            ("specials", lambda: dict_specials(catalog.products), lambda: columnar_specials(catalog)),
+            ("category", lambda: dict_category(catalog.products, category), lambda: columnar_category(catalog, category)),
+        ]
+        for label, dicts, columnar in cases:
+            expected, got = dicts(), columnar()
+            assert expected[0] == got[0] and [p["id"] for p in expected[1]] == [p["id"] for p in got[1]], label
+            before = time_ms(dicts, args.repeat)
+            after = time_ms(columnar, args.repeat)
+            print(f"{size:>7} products, {label:<17} dicts={before:.2f}ms columnar={after:.2f}ms "
+                  f"({before / after:.0f}x, {expected[0]} matches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Product lookup by id: scanning the product list vs ProductCatalog.get.
+
+Times single lookups, which is what get_product and get_product_history do.
+It also times resolving a batch of alert product ids, the alert checker's
+access pattern. Catalog sizes run up to 100k synthetic products.
+
+    python benchmarks/bench_product_lookup.py
+"""
+import argparse
+import random
+import time
+
+from synthetic_catalog import make_products
+import server
+
+
+def scan(products, product_id):
+    for p in products:
+        if p["id"] == product_id:
+            return p
+    return None
+
+
+def time_us(fn, ids) -> float:
+    started = time.perf_counter()
+    for product_id in ids:
+        fn(product_id)
+    return (time.perf_counter() - started) / len(ids) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--alerts", type=int, default=100)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        catalog = server.ProductCatalog(make_products(size))
+        rng = random.Random(1)
+        ids = [rng.choice(catalog.products)["id"] for _ in range(args.lookups)]
+        scan_us = time_us(lambda product_id: scan(catalog.products, product_id), ids)
+        get_us = time_us(catalog.get, ids)
+        alert_ids = ids[:args.alerts]
+        started = time.perf_counter()
+        [scan(catalog.products, product_id) for product_id in alert_ids]
+        alerts_scan = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        [catalog.get(product_id) for product_id in alert_ids]
+        alerts_get = (time.perf_counter() - started) * 1000
+        print(f"{size:>7} products: lookup scan={scan_us:.1f}us get={get_us:.2f}us  "
+              f"{len(alert_ids)} alerts scan={alerts_scan:.1f}ms get={alerts_get:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
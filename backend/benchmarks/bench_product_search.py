@@ -0,0 +1,47 @@
+"""Product text matching: linear substring scan vs the token index.
+
+Builds synthetic catalogs of 1k, 10k and 100k products and times the text
+filter step for a mix of queries with both approaches.
+
+    python benchmarks/bench_product_search.py
+"""
+import argparse
+import time
+
+from synthetic_catalog import QUERIES, make_products
+import server
+
+
+def linear_scan(products, q):
+    # What search_products did before the index
+    q_lower = q.lower()
+    return [p for p in products if q_lower in p["name"].lower() or q_lower in p.get("brand", "").lower()]
+
+
+def time_per_query(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for q in QUERIES:
+            fn(q)
+    return (time.perf_counter() - started) / (repeat * len(QUERIES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        products = make_products(size)
+        started = time.perf_counter()
+        catalog = server.ProductCatalog(products)
+        build = time.perf_counter() - started
+        scan_us = time_per_query(lambda q: linear_scan(products, q), args.repeat)
+        index_us = time_per_query(lambda q: [catalog.products[o] for o in catalog.text_index.search(q)], args.repeat)
+        print(f"{size:>7} products: build={build * 1000:.0f}ms linear={scan_us:.0f}us/query "
+              f"index={index_us:.0f}us/query speedup={scan_us / index_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Latency of /api/scrape/{query} with and without pooled scraper sessions.
+
+"per-request" rebuilds the connection for every scrape, as the scrapers did
+when they opened a fresh ClientSession per call. "pooled" uses the
+app-lifetime ScraperClients with keep-alive and DNS caching. The stub
+serves plain HTTP, so real stores (TLS + remote DNS) gain more than this shows.
+
+    python benchmarks/bench_scrape_client.py --requests 400 --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import aiohttp
+import httpx
+
+from stub_store import StubStore
+import server
+
+
+class PerRequestClients(server.ScraperClients):
+    """No keep-alive and no DNS cache: every scrape opens a new connection"""
+
+    def _connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(force_close=True, use_dns_cache=False)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(mode: str, clients: server.ScraperClients, total: int, concurrency: int):
+    server.scraper_clients = clients
+    latencies = []
+    counter = iter(range(total))
+    transport = httpx.ASGITransport(app=server.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def worker():
+            for i in counter:
+                # Unique queries so every request goes upstream
+                started = time.perf_counter()
+                response = await http.get(f"/api/scrape/{mode}-{i}")
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    await clients.close()
+    print(f"{mode:>12}: n={len(latencies)} p50={percentile(latencies, 50):.2f}ms "
+          f"p99={percentile(latencies, 99):.2f}ms mean={statistics.mean(latencies):.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    stub = await StubStore().start()
+    stub.point_stores_here(server)
+    try:
+        await run("per-request", PerRequestClients(), args.requests, args.concurrency)
+        await run("pooled", server.ScraperClients(), args.requests, args.concurrency)
+    finally:
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""Requests/sec for /api/products/search?page_size=100: validated vs orjson fast path.
+
+search_products returns an ORJSONResponse, so FastAPI skips response_model
+validation and jsonable_encoder. For the "validated" baseline, the
+benchmark mounts a second route that returns the same page as plain data
+under response_model=ProductResponse, which is the pre-change behaviour.
+Requests run in-process over httpx's ASGI transport with a fixed
+concurrency.
+
+    python benchmarks/bench_search_throughput.py
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+import orjson
+
+from synthetic_catalog import make_products
+import server
+
+
+@server.app.get("/bench/validated-search", response_model=server.ProductResponse, response_model_exclude_unset=True)
+async def validated_search(page_size: int = 100, page: int = 1):
+    response = await server.search_products(
+        q="", category=None, store=None, min_price=None, max_price=None,
+        sort_by="best_price", page=page, page_size=page_size, fuzzy=False, fields=None, cursor=None,
+    )
+    return orjson.loads(response.body)
+
+
+async def run(path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        assert len((await http.get(path)).json()["products"]) == 100
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await http.get(path)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    server.catalog = server.ProductCatalog(make_products(args.products))
+    validated = await run("/bench/validated-search?page_size=100", args.requests, args.concurrency)
+    fast = await run("/api/products/search?page_size=100", args.requests, args.concurrency)
+    print(f"page_size=100 over {args.products} products: validated={validated:.0f} req/s "
+          f"orjson={fast:.0f} req/s ({fast / validated:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""Substring and fuzzy product search: linear scan vs the trigram index.
+
+For catalogs up to 100k synthetic products, times mid-word substring
+queries with a linear ``in`` scan and with TrigramIndex.search (checking
+both return the same products), the same for 1-2 character queries
+(answered from the short-gram postings), plus typo queries through
+TrigramIndex.fuzzy.
+
+    python benchmarks/bench_trigram_search.py
+"""
+import argparse
+import time
+
+from synthetic_catalog import make_products
+import server
+
+SUBSTRING_QUERIES = ["nana", "hamp", "ree ran", "butter", "almon", "kellogg", "xyz", "lomiren", "zelbr", "asvoq", "nordun"]
+SHORT_QUERIES = ["mi", "ka", "zq", "k", "e ", "2"]
+FUZZY_QUERIES = ["bannana", "shampo", "yoghert", "devondail", "kalomirren", "zelbraa"]
+
+
+def linear_scan(texts, q):
+    q = q.lower()
+    return [ordinal for ordinal, text in enumerate(texts) if q in text]
+
+
+def time_per_query(fn, queries, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            fn(q)
+    return (time.perf_counter() - started) / (repeat * len(queries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        texts = [server.substring_text(p) for p in make_products(size)]
+        index = server.TrigramIndex()
+        started = time.perf_counter()
+        index.build(texts)
+        build = time.perf_counter() - started
+        for q in SUBSTRING_QUERIES + SHORT_QUERIES:
+            assert index.search(q) == linear_scan(texts, q), q
+        scan_us = time_per_query(lambda q: linear_scan(texts, q), SUBSTRING_QUERIES, args.repeat)
+        index_us = time_per_query(index.search, SUBSTRING_QUERIES, args.repeat)
+        short_scan_us = time_per_query(lambda q: linear_scan(texts, q), SHORT_QUERIES, args.repeat)
+        short_index_us = time_per_query(index.search, SHORT_QUERIES, args.repeat)
+        fuzzy_us = time_per_query(index.fuzzy, FUZZY_QUERIES, args.repeat)
+        print(f"{size:>7} products: build={build * 1000:.0f}ms substring linear={scan_us:.0f}us "
+              f"trigram={index_us:.0f}us ({scan_us / index_us:.1f}x) "
+              f"short linear={short_scan_us:.0f}us index={short_index_us:.0f}us ({short_scan_us / short_index_us:.1f}x) "
+              f"fuzzy={fuzzy_us:.0f}us/query")
+
+
+if __name__ == "__main__":
+    main()
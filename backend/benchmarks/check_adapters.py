@@ -0,0 +1,93 @@
+"""Check every registered store adapter against saved and stubbed pages.
+
+1. Parses each store's saved search-page fixture through its adapter and
+   checks it yields 10 normalised products.
+2. Runs scrape_all_stores against the stub store and checks every adapter
+   was hit once and returned products.
+3. Makes the stub store hang past the adapters' timeout during a refresh
+   and checks every store's breaker counted the timeout and the refresh
+   kept the previous products instead of caching empty lists.
+4. Makes one store answer 404 and checks it is cached as no products for
+   the full cache duration, which counts as an answer, not a
+   failure, for its breaker.
+
+    python benchmarks/check_adapters.py
+"""
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from stub_store import StubStore
+import server
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def check_fixtures():
+    for store, adapter in server.STORE_ADAPTERS.items():
+        html = (FIXTURES / f"{store}_search.html").read_text()
+        products = adapter.normalise(adapter.parse(html))
+        assert len(products) == 10, f"{store}: expected 10 products, got {len(products)}"
+        assert all(p["store"] == store and p["price"] > 0 and p["name"] for p in products)
+        print(f"{store:>10} fixture: {len(products)} products, first {products[0]['name']!r} ${products[0]['price']:.2f}")
+
+
+async def check_fan_out():
+    stub = await StubStore().start()
+    stub.point_stores_here(server)
+    try:
+        scrape = await server.scrape_all_stores("milk")
+        assert set(scrape["data"]) == set(server.STORE_ADAPTERS)
+        assert all(len(products) == 10 for products in scrape["data"].values()), scrape["data"]
+        assert all(hits == 1 for hits in stub.hits.values()), stub.hits
+        print(f"fan-out: {', '.join(f'{s}={len(p)}' for s, p in scrape['data'].items())}")
+    finally:
+        await server.scraper_clients.close()
+        await stub.stop()
+
+
+async def check_hanging_stores():
+    stub = await StubStore().start()
+    stub.point_stores_here(server)
+    try:
+        scrape = await server.scrape_all_stores("eggs")
+        stub.latency = 1.0
+        for adapter in server.STORE_ADAPTERS.values():
+            adapter.timeout = 0.2
+        failures = {store: breaker.consecutive_failures for store, breaker in server.scrape_breakers.items()}
+        refreshed = await server._scrape_and_cache("eggs", "scrape:eggs")
+        counted = {store: breaker.consecutive_failures - failures[store] for store, breaker in server.scrape_breakers.items()}
+        assert all(n == 1 for n in counted.values()), counted
+        assert refreshed["unavailable"] == {store: "timeout" for store in server.STORE_ADAPTERS}, refreshed["unavailable"]
+        assert refreshed["data"] == scrape["data"]
+        print(f"hanging stores: timeouts counted by every breaker {counted}, previous products kept")
+    finally:
+        for adapter in server.STORE_ADAPTERS.values():
+            adapter.timeout = server.SCRAPER_TIMEOUT
+        await server.scraper_clients.close()
+        await stub.stop()
+
+
+async def check_missing_page():
+    stub = await StubStore().start()
+    stub.point_stores_here(server)
+    stub.status["aldi"] = 404
+    try:
+        scrape = await server._scrape_and_cache("bread", "scrape:bread")
+        assert scrape["data"]["aldi"] == [] and "unavailable" not in scrape, scrape.get("unavailable")
+        assert server.scrape_breakers["aldi"].consecutive_failures == 0  # the store answered
+        expires_at = server.price_cache._entries["scrape:bread"][0]
+        assert expires_at - time.monotonic() > server.SCRAPE_PARTIAL_TTL, expires_at - time.monotonic()
+        print("missing page: aldi 404 cached as no products for the full cache duration")
+    finally:
+        await server.scraper_clients.close()
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    check_fixtures()
+    asyncio.run(check_fan_out())
+    asyncio.run(check_hanging_stores())
+    asyncio.run(check_missing_page())
@@ -0,0 +1,141 @@
+"""Alert scheduler check: coalesced triggers, the cheap new-alert path, and leader election.
+
+- burst: --triggers check requests arrive over --burst seconds while a
+  full pass takes --job seconds. The AlertScheduler should run at most one
+  pass at a time and at most one per --min-interval, however many arrive.
+- new alerts: --alerts alert creations each checked on their own via
+  AlertEngine.add, against the cost of a full re-check per creation (what
+  POST /api/alerts used to schedule).
+- election (--election, needs a mongod at MONGO_URL): --workers
+  schedulers share one lease in a scratch database; after their startup
+  pass only the lease holder keeps running periodic passes, while the
+  others run their follower refresh on the interval.
+
+    python benchmarks/check_alert_scheduler.py
+    python benchmarks/check_alert_scheduler.py --election --workers 4
+"""
+import argparse
+import asyncio
+import logging
+import math
+import time
+
+import stub_store  # noqa: F401  (sets up env and import path)
+import server
+
+
+class CountingJob:
+    def __init__(self, duration: float):
+        self.duration = duration
+        self.runs = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.duration)
+            self.runs += 1
+        finally:
+            self.running -= 1
+
+
+async def burst(args):
+    job = CountingJob(args.job)
+    scheduler = server.AlertScheduler("burst", job, interval=3600, min_interval=args.min_interval)
+    scheduler.start()
+    while scheduler.runs < 1:
+        await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    for _ in range(args.triggers):
+        scheduler.trigger()
+        await asyncio.sleep(args.burst / args.triggers)
+    while scheduler.state != "idle":
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    await scheduler.stop()
+    passes = job.runs - 1
+    allowed = math.ceil(elapsed / args.min_interval) + 1
+    print(f"burst:      {args.triggers} triggers over {elapsed:.2f}s -> {passes} passes "
+          f"(limit {allowed}), {scheduler.coalesced} coalesced, last run {scheduler.last_duration}s")
+    assert job.max_running == 1, job.max_running
+    assert 1 <= passes <= allowed, (passes, allowed)
+
+
+async def new_alerts(args):
+    catalog = server.catalog
+    engine = server.AlertEngine(catalog, lambda fired: asyncio.sleep(0))
+    existing = [
+        {"id": f"existing-{i}", "product_id": catalog.products[i % len(catalog.products)]["id"],
+         "product_name": "existing", "target_price": 0.01, "email": None}
+        for i in range(args.existing)
+    ]
+
+    async def stream(alerts):
+        for alert in alerts:
+            yield alert
+
+    started = time.perf_counter()
+    await engine.reload(stream(existing))
+    full_pass = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(args.alerts):
+        engine.add({"id": f"new-{i}", "product_id": catalog.products[i % len(catalog.products)]["id"],
+                    "product_name": "new", "target_price": 0.01, "email": None})
+    per_alert = (time.perf_counter() - started) / args.alerts
+    print(f"new alerts: {args.alerts} creations checked in {per_alert * 1e6:.1f}us each; a full re-check of "
+          f"{args.existing} alerts per creation would cost {full_pass * 1e3:.1f}ms each")
+
+
+async def election(args):
+    db = server.client[args.database]
+    jobs = [CountingJob(0.01) for _ in range(args.workers)]
+    refreshes = [CountingJob(0.01) for _ in range(args.workers)]
+    schedulers = [
+        server.AlertScheduler("election", job, interval=args.interval, min_interval=0, leases=db.scheduler_leases,
+                              follower_job=refresh)
+        for job, refresh in zip(jobs, refreshes)
+    ]
+    try:
+        for scheduler in schedulers:
+            scheduler.start()
+        await asyncio.sleep(args.interval * 6)
+        for scheduler in schedulers:
+            await scheduler.stop()
+        periodic = [job.runs - 1 for job in jobs]
+        leaders = [i for i, runs in enumerate(periodic) if runs]
+        followed = [refresh.runs for refresh in refreshes]
+        print(f"election:   {args.workers} workers, periodic passes per worker {periodic}, "
+              f"follower refreshes {followed}")
+        assert len(leaders) == 1, leaders
+        assert all(runs for i, runs in enumerate(followed) if i not in leaders), followed
+    finally:
+        await server.client.drop_database(args.database)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--triggers", type=int, default=1000)
+    parser.add_argument("--burst", type=float, default=2.0)
+    parser.add_argument("--job", type=float, default=0.2)
+    parser.add_argument("--min-interval", type=float, default=0.5)
+    parser.add_argument("--alerts", type=int, default=1000)
+    parser.add_argument("--existing", type=int, default=50_000)
+    parser.add_argument("--election", action="store_true")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.5)
+    parser.add_argument("--database", default="pricepantry_scheduler_check")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    await burst(args)
+    await new_alerts(args)
+    if args.election:
+        await election(args)
+    print("ok")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""Notification outbox delivery check against a local mongod.
+
+Needs a running mongod at MONGO_URL (default mongodb://localhost:27017).
+Everything happens in a scratch database, which is dropped afterwards.
+Inserts --alerts untriggered alerts that all fire, spread over
+--recipients addresses, and runs the consistency pass so half of them get
+outbox rows. Then:
+- one claim of --abandon rows is leased and dropped, as if its worker died
+- --workers outbox workers start draining through FakeEmailTransport,
+  with --fail-rate of API calls raising to exercise backoff and retries,
+  and --lost-ack-rate of calls raising after the emails went out, so only
+  the idempotency key stops the retry from sending them again
+- the other half of the alerts fire while retries are in flight, so new
+  alerts for the same recipients are due alongside sends being retried
+Checks that every alert is marked triggered, every outbox row ends up
+sent, and every alert reached its recipient exactly once.
+
+    python benchmarks/check_outbox.py --alerts 2000 --fail-rate 0.3
+"""
+import argparse
+import asyncio
+import logging
+import random
+import re
+import time
+from collections import Counter
+
+import stub_store  # noqa: F401  (sets up env and import path)
+import server
+from fake_email import FakeEmailTransport
+
+
+class LostAckTransport(FakeEmailTransport):
+    """Delivers, then sometimes fails as if the response never came back"""
+
+    def __init__(self, latency: float, fail_rate: float, lost_ack_rate: float):
+        super().__init__(latency, fail_rate)
+        self.lost_ack_rate = lost_ack_rate
+
+    def send_batch(self, params, idempotency_key=None):
+        response = super().send_batch(params, idempotency_key)
+        if random.random() < self.lost_ack_rate:
+            raise TimeoutError("simulated lost response")
+        return response
+
+
+def make_alerts(n: int, recipients: int, seed: int = 11):
+    rng = random.Random(seed)
+    alerts = []
+    for i in range(n):
+        ordinal = rng.randrange(len(server.catalog.products))
+        price, _ = server.catalog.best_price(ordinal)
+        if price == float('inf'):
+            continue
+        alerts.append({
+            "id": f"check-{i}", "product_id": server.catalog.products[ordinal]["id"], "product_name": f"[check-{i:06d}]",
+            "target_price": price + 1, "current_best_price": price, "email": f"user{rng.randrange(recipients)}@example.com",
+            "triggered": False,
+        })
+    return alerts
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alerts", type=int, default=2000)
+    parser.add_argument("--recipients", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--abandon", type=int, default=50)
+    parser.add_argument("--fail-rate", type=float, default=0.3)
+    parser.add_argument("--lost-ack-rate", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--database", default="pricepantry_outbox_check")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    server.db = server.client[args.database]
+    transport = LostAckTransport(args.latency, args.fail_rate, args.lost_ack_rate)
+    server.email_dispatcher = server.EmailDispatcher(transport)
+    outbox = server.NotificationOutbox(server.db.notification_outbox, claim_batch=20, max_attempts=50,
+                                       base_backoff=0.05, max_backoff=0.5, lease=60, poll_interval=0.1)
+    outbox.register("email", server.deliver_alert_emails, server.plan_alert_emails, args.workers)
+    server.outbox = outbox
+
+    alerts = make_alerts(args.alerts, args.recipients)
+    first, second = alerts[:len(alerts) // 2], alerts[len(alerts) // 2:]
+    try:
+        await server.db.price_alerts.insert_many(first)
+        await outbox.ensure_indexes()
+        await server.check_price_alerts_and_notify()
+        await server.alert_engine.drain()
+        triggered = await server.db.price_alerts.count_documents({"triggered": True})
+        queued = await server.db.notification_outbox.count_documents({})
+        assert triggered == len(first) == queued, (triggered, len(first), queued)
+
+        # A second pass finds nothing to fire and queues nothing new
+        await server.check_price_alerts_and_notify()
+        await server.alert_engine.drain()
+        assert await server.db.notification_outbox.count_documents({}) == queued
+
+        # Abandoned with a short lease so the check does not wait out the real one
+        outbox.lease = 1.0
+        _, abandoned = await outbox.claim("email", args.abandon)
+        outbox.lease = 60
+        started = time.perf_counter()
+        outbox.start()
+        while not outbox.retried:
+            await asyncio.sleep(0.01)
+        await server.db.price_alerts.insert_many(second)
+        await server.check_price_alerts_and_notify()
+        await server.alert_engine.drain()
+        queued = await server.db.notification_outbox.count_documents({})
+        assert queued == len(alerts), (queued, len(alerts))
+        while (await outbox.counts())["email"].get("sent", 0) < queued:
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - started
+        await outbox.stop()
+
+        delivered = Counter()
+        for message in transport.sent:
+            delivered.update(set(re.findall(r"\[check-\d{6}\]", message["html"])))
+        missing = [alert["id"] for alert in alerts if not delivered[alert["product_name"]]]
+        duplicated = [name for name, count in delivered.items() if count > 1]
+        print(f"{queued} notifications ({len(abandoned)} abandoned mid-claim) delivered in {elapsed:.2f}s: "
+              f"{transport.calls} API calls, {len(transport.sent)} emails, outbox {outbox.stats()}")
+        assert not missing, f"{len(missing)} alerts never delivered"
+        assert not duplicated, f"{len(duplicated)} alerts delivered more than once"
+        print("ok: no lost or duplicate notifications")
+    finally:
+        await server.client.drop_database(args.database)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""Concurrency check: a burst of identical searches scrapes each store once.
+
+Fires --callers concurrent scrape_all_stores() calls for the same query
+(with varying case/whitespace) against the stub store and reports how many
+upstream hits each store received. Also verifies that a cancelled caller
+does not cancel the shared scrape and that errors reach every waiter.
+
+    python benchmarks/check_singleflight.py --callers 50
+"""
+import argparse
+import asyncio
+import logging
+
+from stub_store import StubStore
+import server
+
+
+async def burst(stub: StubStore, callers: int):
+    variants = ["milk", "Milk", "  milk ", "MILK"]
+    results = await asyncio.gather(*(server.scrape_all_stores(variants[i % len(variants)]) for i in range(callers)))
+    assert all(r["data"] is results[0]["data"] for r in results), "callers did not share one result"
+    print(f"{callers} concurrent callers -> upstream hits {stub.hits}")
+    assert all(hits == 1 for hits in stub.hits.values())
+
+
+async def cancelled_waiter(stub: StubStore):
+    before = dict(stub.hits)
+    first = asyncio.create_task(server.scrape_all_stores("bread"))
+    second = asyncio.create_task(server.scrape_all_stores("bread"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    data = await second
+    assert first.cancelled() and len(data["data"]["coles"]) == 10
+    print(f"cancelled waiter left shared scrape intact (hits +{stub.hits['coles'] - before['coles']})")
+
+
+async def error_propagation():
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    flights = server.SingleFlight()
+    results = await asyncio.gather(*(flights.do("k", boom) for _ in range(5)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flights.in_flight() == 0
+    print("error reached all 5 waiters")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callers", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    stub = await StubStore(latency=0.05).start()
+    stub.point_stores_here(server)
+    try:
+        await burst(stub, args.callers)
+        await cancelled_waiter(stub)
+        await error_propagation()
+    finally:
+        await server.scraper_clients.close()
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
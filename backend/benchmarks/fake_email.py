@@ -0,0 +1,38 @@
+"""Offline email transport for benchmarks and checks, shaped like ResendTransport."""
+import random
+import time
+import uuid
+from typing import Dict, List, Optional
+
+
+class FakeEmailTransport:
+    """Offline stand-in for Resend: records messages and blocks ``latency`` seconds per API call.
+
+    Like Resend it ignores a call whose idempotency key it has already
+    seen, and rejects one that reuses a key for different emails.
+    ``fail_rate`` makes that share of calls raise instead.
+    """
+
+    def __init__(self, latency: float = 0.05, fail_rate: float = 0.0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.calls = 0
+        self.sent: List[Dict] = []
+        self._keys: Dict[str, List[Dict]] = {}
+
+    def send(self, params: Dict, idempotency_key: Optional[str] = None) -> Dict:
+        return self.send_batch([params], idempotency_key)["data"][0]
+
+    def send_batch(self, params: List[Dict], idempotency_key: Optional[str] = None) -> Dict:
+        time.sleep(self.latency)
+        self.calls += 1
+        if random.random() < self.fail_rate:
+            raise RuntimeError("simulated Resend failure")
+        if idempotency_key in self._keys:
+            if self._keys[idempotency_key] != params:
+                raise ValueError(f"idempotency key {idempotency_key} reused for different emails")
+        else:
+            self.sent.extend(params)
+            if idempotency_key:
+                self._keys[idempotency_key] = params
+        return {"data": [{"id": str(uuid.uuid4())} for _ in params]}
@@ -0,0 +1,98 @@
+"""Local stand-in for the stores' search pages.
+
+Serves search result pages in the markup each store adapter expects and
+counts upstream hits, so benchmarks can run without touching the real
+stores. Each store gets its own port, and so its own pooled session.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+# server.py reads these at import time
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'pricepantry_bench')
+os.environ.setdefault('SCRAPE_CACHE_SHARED', 'false')  # no mongod needed
+# Benchmarks measure the scrape path itself, not the politeness limits
+os.environ.setdefault('SCRAPER_RATE_PER_SEC', '100000')
+os.environ.setdefault('SCRAPER_BURST', '100000')
+os.environ.setdefault('SCRAPER_MAX_IN_FLIGHT', '64')
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# store -> (search path, query parameter, tile markup)
+STUB_STORES = {
+    "coles": ("/search", "q",
+              '<div data-testid="product-tile"><h2 data-testid="product-title">{name}</h2>'
+              '<span data-testid="product-price">${price:.2f}</span></div>'),
+    "woolworths": ("/shop/search/products", "searchTerm",
+                   '<div class="product-tile-v2"><div class="product-title">{name}</div>'
+                   '<div class="price">${price:.2f}</div></div>'),
+    "aldi": ("/results", "q",
+             '<div class="product-tile"><div class="product-tile__name">{name}</div>'
+             '<span class="base-price__regular">${price:.2f}</span></div>'),
+    "iga": ("/search", "q",
+            '<div data-testid="product-card"><span data-testid="product-card-name">{name}</span>'
+            '<span data-testid="product-card-price">${price:.2f}</span></div>'),
+    "costco": ("/search", "text",
+               '<div class="product-list-item"><div class="product-name"><a>{name}</a></div>'
+               '<div class="product-price-amount">${price:.2f}</div></div>'),
+}
+
+
+def filler(elements: int) -> str:
+    """Navigation-style markup that bulks a page up like the real stores'"""
+    return "".join(f'<li class="nav-item"><a href="/browse/{i}"><span>Aisle {i}</span></a></li>' for i in range(elements))
+
+
+def store_page(store: str, query: str, tiles: int = 24, padding: int = 0) -> str:
+    template = STUB_STORES[store][2]
+    items = "".join(template.format(name=f"{store} {query} {i}", price=2 + i * 0.25) for i in range(tiles))
+    return f"<html><body><nav><ul>{filler(padding)}</ul></nav><main>{items}</main></body></html>"
+
+
+class StubStore:
+    """aiohttp servers answering every store's search URL on localhost"""
+
+    def __init__(self, latency: float = 0.0, tiles: int = 24, padding: int = 0):
+        self.latency = latency
+        self.tiles = tiles
+        self.padding = padding
+        self.hits = {store: 0 for store in STUB_STORES}
+        self.status = {}  # store -> HTTP status to answer with instead of a page
+        self.ports = {}
+        self._runners = []
+
+    def _handler(self, store: str):
+        param = STUB_STORES[store][1]
+
+        async def handle(request):
+            self.hits[store] += 1
+            await asyncio.sleep(self.latency)
+            if store in self.status:
+                return web.Response(status=self.status[store])
+            return web.Response(text=store_page(store, request.query.get(param, ""), self.tiles, self.padding), content_type="text/html")
+
+        return handle
+
+    async def start(self):
+        for store, (path, _, _) in STUB_STORES.items():
+            app = web.Application()
+            app.router.add_get(path, self._handler(store))
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            self._runners.append(runner)
+            self.ports[store] = site._server.sockets[0].getsockname()[1]
+        return self
+
+    def point_stores_here(self, server_module):
+        for store, port in self.ports.items():
+            server_module.STORES[store]["url"] = f"http://localhost:{port}"
+
+    async def stop(self):
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners = []
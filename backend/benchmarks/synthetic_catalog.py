@@ -0,0 +1,51 @@
+"""Synthetic product catalogs shaped like MOCK_PRODUCTS, for benchmarks at scale."""
+import random
+import uuid
+
+import stub_store  # noqa: F401  (sets up env and import path)
+import server
+
+ADJECTIVES = ["Organic", "Free Range", "Lite", "Extra", "Classic", "Smoked", "Crunchy", "Smooth", "Original",
+              "Honey", "Spicy", "Roasted", "Fresh", "Frozen", "Premium", "Wholemeal", "Salted", "Unsalted"]
+NOUNS = ["Milk", "Bread", "Cheese", "Yoghurt", "Chicken", "Beef Mince", "Pasta", "Rice", "Cereal", "Coffee",
+         "Tea", "Chips", "Biscuits", "Juice", "Butter", "Eggs", "Bananas", "Apples", "Tomatoes", "Salmon",
+         "Shampoo", "Toothpaste", "Detergent", "Ice Cream", "Peanut Butter", "Honey", "Olive Oil", "Soup"]
+BRANDS = ["Devondale", "Bega", "Arnott's", "Kellogg's", "Sanitarium", "Helga's", "Tip Top", "Coles", "Woolworths",
+          "Macro", "Community Co", "Kirkland Signature", "Farmdale", "Nestle", "Cadbury", "Lurpak", "Moccona"]
+# Syllables for made-up variety names, so large catalogs have a realistic spread of rare words
+SYLLABLES = ["ka", "lo", "mi", "ren", "tas", "vo", "qui", "zel", "bra", "nor", "pe", "dun", "fi", "gar", "hol", "jin"]
+SIZES = ["100g", "250g", "500g", "1kg", "2L", "1L", "600ml", "12 Pack", "Each"]
+
+
+def make_products(n: int, seed: int = 42, history: bool = False):
+    rng = random.Random(seed)
+    products = []
+    for i in range(n):
+        base = round(rng.uniform(1, 25), 2)
+        store_prices = {
+            store: {
+                "price": round(base * rng.uniform(0.8, 1.3), 2),
+                "available": rng.random() > 0.1,
+                "on_special": rng.random() < 0.2,
+            }
+            for store in server.STORES
+        }
+        products.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "name": f"{rng.choice(ADJECTIVES)} {''.join(rng.choices(SYLLABLES, k=3)).title()} {rng.choice(NOUNS)} {rng.choice(SIZES)}",
+            "category": rng.choice(server.CATEGORIES),
+            "brand": rng.choice(BRANDS),
+            "size": rng.choice(SIZES),
+            "unit": "each",
+            "image": "https://example.com/image.jpg",
+            "store_prices": store_prices,
+            "price_history": server.generate_price_history(base, 30) if history else [],
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "source": "synthetic",
+        })
+    return products
+
+
+# Queries mixing common, rare, multi-term and partly typed words
+QUERIES = ["milk", "organic", "free range eggs", "choc", "kellogg", "smoked salmon", "peanut butter",
+           "devondale milk", "ban", "ice cream", "premium coffee", "shampoo", "xyz", "kalomi", "zelbra tea", "quiren"]
@@ -1,22 +1,38 @@
-from fastapi import FastAPI, APIRouter, Query, HTTPException, BackgroundTasks
+from fastapi import FastAPI, APIRouter, Query, HTTPException, Request, Response
 from dotenv import load_dotenv
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
 import logging
 import httpx
 import aiohttp
 import asyncio
 import resend
+import numpy as np
+import orjson
 from bs4 import BeautifulSoup
+from lxml import etree
 from pathlib import Path
+from urllib.parse import quote
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Awaitable, Tuple, AsyncIterator
 import uuid
 from datetime import datetime, timezone, timedelta
 import random
 import re
 import json
+import time
+import hashlib
+import base64
+import heapq
+from collections import Counter, OrderedDict, deque
+from itertools import chain
+from bisect import bisect_left, insort
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -36,6 +52,25 @@ SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
 if RESEND_API_KEY:
     resend.api_key = RESEND_API_KEY
 
+# Price alert configuration
+ALERT_CONSISTENCY_INTERVAL = float(os.environ.get('ALERT_CONSISTENCY_INTERVAL', '900'))  # seconds between full re-checks
+ALERT_CHECK_MIN_INTERVAL = float(os.environ.get('ALERT_CHECK_MIN_INTERVAL', '60'))  # requested re-checks coalesce to one per this many seconds
+ALERT_LEADER_ELECTION = os.environ.get('ALERT_LEADER_ELECTION', 'false').lower() == 'true'  # periodic re-checks in one worker only
+ALERT_READ_BATCH = int(os.environ.get('ALERT_READ_BATCH', '1000'))  # cursor batch size when streaming alerts
+ALERT_WRITE_BATCH = int(os.environ.get('ALERT_WRITE_BATCH', '500'))  # triggered-state updates per bulk_write
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', '100'))  # Resend batch sends take up to 100 emails
+EMAIL_MAX_CONCURRENCY = int(os.environ.get('EMAIL_MAX_CONCURRENCY', '4'))  # Resend API calls in flight
+
+# Notification outbox configuration
+OUTBOX_EMAIL_WORKERS = int(os.environ.get('OUTBOX_EMAIL_WORKERS', '2'))  # outbox workers per process for the email channel
+OUTBOX_CLAIM_BATCH = int(os.environ.get('OUTBOX_CLAIM_BATCH', '100'))  # rows a worker claims per round
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '8'))  # deliveries tried before a row is marked failed
+OUTBOX_BACKOFF = float(os.environ.get('OUTBOX_BACKOFF', '30'))  # first retry delay, doubles per attempt
+OUTBOX_MAX_BACKOFF = float(os.environ.get('OUTBOX_MAX_BACKOFF', '3600'))
+OUTBOX_LEASE = float(os.environ.get('OUTBOX_LEASE', '300'))  # seconds a claimed row is held before another worker may retry it
+OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', '5'))  # idle workers look for due rows this often
+MONGO_TRANSACTIONS = os.environ.get('MONGO_TRANSACTIONS', 'false').lower() == 'true'  # needs a replica set
+
 # Create the main app without a prefix
 app = FastAPI()
 
@@ -72,8 +107,35 @@ api_usage = {
 }
 
 # Cache for API results and scraped data
-price_cache: Dict[str, Dict] = {}
 CACHE_DURATION = 3600  # 1 hour in seconds
+PRICE_CACHE_MAX_ENTRIES = int(os.environ.get('PRICE_CACHE_MAX_ENTRIES', '256'))
+PRICE_CACHE_MAX_BYTES = int(os.environ.get('PRICE_CACHE_MAX_BYTES', '0'))  # 0 = no byte budget
+PRICE_CACHE_STALE_GRACE = int(os.environ.get('PRICE_CACHE_STALE_GRACE', '21600'))  # serve stale for up to 6 hours while refreshing
+SCRAPE_CACHE_SHARED = os.environ.get('SCRAPE_CACHE_SHARED', 'true').lower() == 'true'  # Mongo tier shared across workers
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '128'))  # pre-serialised list responses
+SEARCH_RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('SEARCH_RESULT_CACHE_MAX_ENTRIES', '256'))  # ordered text-search results for cursor pages
+SEARCH_RESULT_CACHE_TTL = 300  # seconds
+
+# Scraper HTTP client configuration
+SCRAPER_TIMEOUT = 15  # seconds
+SCRAPER_LIMIT_PER_HOST = int(os.environ.get('SCRAPER_LIMIT_PER_HOST', '8'))
+SCRAPER_DNS_CACHE_TTL = int(os.environ.get('SCRAPER_DNS_CACHE_TTL', '300'))
+SCRAPER_KEEPALIVE_TIMEOUT = float(os.environ.get('SCRAPER_KEEPALIVE_TIMEOUT', '30'))
+SCRAPER_PARSE_POOL = os.environ.get('SCRAPER_PARSE_POOL', 'thread')  # thread, process or none
+SCRAPER_PARSE_WORKERS = int(os.environ.get('SCRAPER_PARSE_WORKERS', '2'))
+SCRAPER_RATE_PER_SEC = float(os.environ.get('SCRAPER_RATE_PER_SEC', '2'))  # per store
+SCRAPER_BURST = int(os.environ.get('SCRAPER_BURST', '5'))
+SCRAPER_MAX_IN_FLIGHT = int(os.environ.get('SCRAPER_MAX_IN_FLIGHT', '4'))  # per store
+SCRAPER_QUEUE_DEADLINE = float(os.environ.get('SCRAPER_QUEUE_DEADLINE', '5'))  # seconds to wait for a slot
+SCRAPER_BREAKER_FAILURES = int(os.environ.get('SCRAPER_BREAKER_FAILURES', '3'))  # consecutive failures before opening
+SCRAPER_BREAKER_BACKOFF = float(os.environ.get('SCRAPER_BREAKER_BACKOFF', '5'))  # first open period, doubles per re-open
+SCRAPER_BREAKER_MAX_BACKOFF = float(os.environ.get('SCRAPER_BREAKER_MAX_BACKOFF', '300'))
+SCRAPE_PARTIAL_TTL = 60  # seconds to cache results where a store was skipped or timed out
+SCRAPER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-AU,en;q=0.9',
+}
 
 # Configure logging
 logging.basicConfig(
@@ -83,140 +145,834 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # ============================================
-# WEB SCRAPING FOR AUSTRALIAN STORES
+# SCRAPER HTTP CLIENTS
 # ============================================
 
-async def scrape_coles_prices(query: str) -> List[Dict]:
-    """Scrape prices from Coles website"""
-    products = []
-    try:
-        search_url = f"https://www.coles.com.au/search?q={query.replace(' ', '%20')}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-AU,en;q=0.9',
+class ScraperClients:
+    """App-lifetime pool of aiohttp sessions, one per store host.
+
+    Reusing a session keeps connections alive between scrapes so only the
+    first request to a store pays for DNS, TCP and TLS setup.
+    """
+
+    def __init__(self, limit_per_host: int = SCRAPER_LIMIT_PER_HOST, dns_cache_ttl: int = SCRAPER_DNS_CACHE_TTL, keepalive_timeout: float = SCRAPER_KEEPALIVE_TIMEOUT):
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+
+    def _connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+
+    def get(self, base_url: str) -> aiohttp.ClientSession:
+        """Return the pooled session for a store, creating it on first use"""
+        session = self._sessions.get(base_url)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=self._connector(),
+                headers=SCRAPER_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=SCRAPER_TIMEOUT),
+            )
+            self._sessions[base_url] = session
+        return session
+
+    def start(self, base_urls: List[str]):
+        for base_url in base_urls:
+            self.get(base_url)
+
+    async def close(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+scraper_clients = ScraperClients()
+
+# ============================================
+# CACHING
+# ============================================
+
+# Every TTLCache registers itself here so /api/cache/stats can report it
+CACHES: Dict[str, "TTLCache"] = {}
+
+class TTLCache:
+    """Bounded in-memory cache with LRU eviction and per-entry TTL.
+
+    Capped by entry count and, optionally, by an approximate byte budget
+    (the JSON-encoded size of each value). With a non-zero ``grace``, an
+    entry past its TTL is kept for that many more seconds and can still be
+    read as stale through ``lookup`` (stale-while-revalidate).
+    """
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int = 0, default_ttl: float = CACHE_DURATION, grace: float = 0):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.grace = grace
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        CACHES[name] = self
+
+    def get(self, key: str) -> Optional[Any]:
+        found = self.lookup(key, allow_stale=False)
+        return found[0] if found else None
+
+    def lookup(self, key: str, allow_stale: bool = True) -> Optional[Tuple[Any, bool]]:
+        """Return (value, is_stale), or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        now = time.monotonic()
+        if entry[0] + self.grace <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        stale = entry[0] <= now
+        if stale and not allow_stale:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return entry[2], stale
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Return the value even if stale, without touching LRU order or counters"""
+        entry = self._entries.get(key)
+        return entry[2] if entry else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        size = len(json.dumps(value, default=str)) if self.max_bytes else 0
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + (ttl if ttl is not None else self.default_ttl), size, value)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes)):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str):
+        self._bytes -= self._entries.pop(key)[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        served = self.hits + self.stale_hits
+        lookups = served + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0,
         }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(search_url, headers=headers, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    product_tiles = soup.select('[data-testid="product-tile"]') or soup.select('.product-tile') or soup.select('.product')
-                    
-                    for tile in product_tiles[:10]:
-                        try:
-                            name_elem = tile.select_one('[data-testid="product-title"]') or tile.select_one('.product-title') or tile.select_one('h3')
-                            price_elem = tile.select_one('[data-testid="product-price"]') or tile.select_one('.price') or tile.select_one('.product-price')
-                            
-                            if name_elem and price_elem:
-                                name = name_elem.get_text(strip=True)
-                                price_text = price_elem.get_text(strip=True)
-                                price_match = re.search(r'\$?(\d+\.?\d*)', price_text)
-                                
-                                if price_match:
-                                    price = float(price_match.group(1))
-                                    products.append({
-                                        "name": name,
-                                        "price": price,
-                                        "store": "coles",
-                                        "source": "scrape"
-                                    })
-                        except Exception as e:
-                            logger.debug(f"Error parsing Coles product: {e}")
-                            continue
-                            
-    except Exception as e:
-        logger.error(f"Error scraping Coles: {e}")
+
+price_cache = TTLCache("price_cache", PRICE_CACHE_MAX_ENTRIES, PRICE_CACHE_MAX_BYTES, grace=PRICE_CACHE_STALE_GRACE)
+
+class SharedScrapeCache:
+    """Second cache tier in the scrape_cache collection, shared by all workers.
+
+    Each process keeps ``memory`` (a small TTLCache) in front of it. A TTL
+    index on ``expires_at`` lets Mongo drop entries once they are past the
+    stale grace window. Mongo errors are logged and treated as misses so a
+    database hiccup never blocks scraping.
+    """
+
+    def __init__(self, collection, memory: TTLCache, ttl: float = CACHE_DURATION, enabled: bool = True):
+        self.collection = collection
+        self.memory = memory
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def ensure_indexes(self):
+        if not self.enabled:
+            return
+        await self.collection.create_index("key", unique=True)
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def get(self, key: str) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """Return (value, is_stale) and copy it into the memory tier, or None"""
+        if not self.enabled:
+            return None
+        try:
+            doc = await self.collection.find_one({"key": key}, {"_id": 0, "value": 1, "fresh_until": 1})
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"scrape_cache read failed: {e}")
+            return None
+        now = time.time()
+        # The TTL monitor only runs once a minute, so check expiry ourselves too
+        if not doc or doc["fresh_until"] + self.memory.grace <= now:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.memory.set(key, doc["value"], ttl=doc["fresh_until"] - now)
+        return doc["value"], doc["fresh_until"] <= now
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None):
+        if not self.enabled:
+            return
+        fresh_until = time.time() + (self.ttl if ttl is None else ttl)
+        try:
+            await self.collection.update_one(
+                {"key": key},
+                {"$set": {
+                    "value": value,
+                    "fresh_until": fresh_until,
+                    "expires_at": datetime.fromtimestamp(fresh_until + self.memory.grace, timezone.utc)
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"scrape_cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+shared_scrape_cache = SharedScrapeCache(db.scrape_cache, price_cache, enabled=SCRAPE_CACHE_SHARED)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header names etag (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+class ResponseCache:
+    """Pre-serialised JSON bodies, each valid for one version of its source data.
+
+    An entry built against an older version is rebuilt on the next request
+    for it, so a data change needs no explicit invalidation. Every body has
+    a content ETag, and a request whose If-None-Match already names it gets
+    a 304 with no body.
+    """
+
+    def __init__(self, name: str, max_entries: int):
+        self._entries = TTLCache(name, max_entries, default_ttl=float('inf'))
+        self.rebuilds = 0
+
+    def respond(self, request: Request, key: str, version: int, build: Callable[[], Any]) -> Response:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            body = orjson.dumps(build())
+            entry = (version, body, '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest())
+            self._entries.set(key, entry)
+            self.rebuilds += 1
+        _, body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+# Specials and category listings, keyed by catalog.version
+list_responses = ResponseCache("list_responses", RESPONSE_CACHE_MAX_ENTRIES)
+
+# ============================================
+# REQUEST COALESCING
+# ============================================
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one shared task.
+
+    Every caller awaits the same task, so an error reaches all of them.
+    The task is shielded: a caller that gets cancelled stops waiting but
+    does not cancel the work the other callers depend on.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await asyncio.shield(self.start(key, fn))
+
+    def start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start fn for key unless it is already running, without waiting for it"""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return task
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Retrieve the exception even if nobody was waiting (background refresh)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error in coalesced task {key}: {task.exception()}")
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+scrape_flights = SingleFlight()
+
+# ============================================
+# SCRAPE RATE LIMITING
+# ============================================
+
+class StoreUnavailable(Exception):
+    """A store gave no usable result (skipped, or tried and failed); callers fall back to cached data.
+
+    ``transient`` outcomes (skipped, timed out) are retried after
+    SCRAPE_PARTIAL_TTL rather than the full cache duration.
+    """
+    reason = "unavailable"
+    transient = True
+
+class ScrapeRateLimited(StoreUnavailable):
+    """A store's scrape budget stayed exhausted past the queueing deadline"""
+    reason = "rate_limited"
+
+class StoreRateLimiter:
+    """Token bucket plus an in-flight cap guarding scrapes of one store.
+
+    Callers queue in FIFO order for a token, then for an in-flight slot.
+    If they cannot get both within ``max_wait`` seconds ScrapeRateLimited
+    is raised so the caller can fall back to cached data.
+    """
+
+    def __init__(self, store: str, rate: float, burst: int, max_in_flight: int, max_wait: float):
+        self.store = store
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._token_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.acquired = 0
+        self.rejected = 0
+        self._waits: deque = deque(maxlen=1000)  # recent wait times in seconds
+
+    async def _take_token(self, deadline: float):
+        async with self._token_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+                if now + delay > deadline:
+                    raise ScrapeRateLimited(f"{self.store} scrape budget exhausted")
+                await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def slot(self):
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        try:
+            await self._take_token(deadline)
+            await asyncio.wait_for(self._slots.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+        except (ScrapeRateLimited, asyncio.TimeoutError):
+            self.rejected += 1
+            raise ScrapeRateLimited(f"{self.store} scrape budget exhausted")
+        self._waits.append(time.monotonic() - started)
+        self.acquired += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "rate_per_sec": self.rate,
+            "burst": self.burst,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "wait_ms_p50": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+            "wait_ms_p99": round(waits[int(len(waits) * 0.99)] * 1000, 1) if waits else 0.0,
+            "wait_ms_max": round(waits[-1] * 1000, 1) if waits else 0.0,
+        }
+
+scrape_limiters = {
+    store: StoreRateLimiter(store, SCRAPER_RATE_PER_SEC, SCRAPER_BURST, SCRAPER_MAX_IN_FLIGHT, SCRAPER_QUEUE_DEADLINE)
+    for store in STORES
+}
+
+# ============================================
+# SCRAPE CIRCUIT BREAKERS
+# ============================================
+
+class CircuitOpen(StoreUnavailable):
+    """The store's circuit breaker is open, so the scrape fails fast"""
+    reason = "circuit_open"
+
+class ScrapeFailed(Exception):
+    """The store answered, but not with a usable search page"""
+
+class StoreScrapeError(StoreUnavailable):
+    """A scrape was tried and failed; its breaker has already counted the failure"""
+    reason = "error"
+    transient = False
+
+class StoreTimedOut(StoreScrapeError):
+    reason = "timeout"
+    transient = True
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one store's scraper.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    scrapes fail fast. Once the backoff has elapsed a single probe is let
+    through (half-open). Success closes the breaker. Failure re-opens it
+    with the backoff doubled, up to ``max_backoff``, and jittered so
+    workers do not probe in lockstep.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, base_backoff: float, max_backoff: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.reset()
+
+    def reset(self):
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+        self.consecutive_opens = 0
+        self.open_until = 0.0
+        self._probing = False
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() >= self.open_until:
+            return self.HALF_OPEN
+        return self._state
+
+    @asynccontextmanager
+    async def guard(self):
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+            raise CircuitOpen(f"{self.name} circuit open")
+        probe = state == self.HALF_OPEN
+        self._probing = probe
+        try:
+            yield
+        except StoreUnavailable:
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        else:
+            self._record_success()
+        finally:
+            if probe:
+                self._probing = False
+
+    def _record_success(self):
+        if self._state != self.CLOSED:
+            logger.info(f"{self.name} circuit closed")
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+        self.consecutive_opens = 0
+
+    def _record_failure(self, error: Exception):
+        self.consecutive_failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        if self._state == self.OPEN or self.consecutive_failures >= self.failure_threshold:
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** self.consecutive_opens)
+            self.consecutive_opens += 1
+            self.open_until = time.monotonic() + random.uniform(backoff / 2, backoff)
+            self._state = self.OPEN
+            logger.warning(f"{self.name} circuit open for up to {backoff:.0f}s after {self.last_error}")
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": round(max(0.0, self.open_until - time.monotonic()), 1) if state == self.OPEN else 0.0,
+            "last_error": self.last_error,
+        }
+
+scrape_breakers = {
+    store: CircuitBreaker(store, SCRAPER_BREAKER_FAILURES, SCRAPER_BREAKER_BACKOFF, SCRAPER_BREAKER_MAX_BACKOFF)
+    for store in STORES
+}
+
+# ============================================
+# HTML EXTRACTION
+# ============================================
+
+def parse_coles_html_soup(html: str) -> List[Dict]:
+    """Extract up to 10 products from a Coles search results page with BeautifulSoup"""
+    products = []
+    soup = BeautifulSoup(html, 'lxml')
+    
+    product_tiles = soup.select('[data-testid="product-tile"]') or soup.select('.product-tile') or soup.select('.product')
+    
+    for tile in product_tiles[:10]:
+        try:
+            name_elem = tile.select_one('[data-testid="product-title"]') or tile.select_one('.product-title') or tile.select_one('h3')
+            price_elem = tile.select_one('[data-testid="product-price"]') or tile.select_one('.price') or tile.select_one('.product-price')
+            
+            if name_elem and price_elem:
+                name = name_elem.get_text(strip=True)
+                price_text = price_elem.get_text(strip=True)
+                price_match = re.search(r'\$?(\d+\.?\d*)', price_text)
+                
+                if price_match:
+                    price = float(price_match.group(1))
+                    products.append({
+                        "name": name,
+                        "price": price,
+                        "store": "coles",
+                        "source": "scrape"
+                    })
+        except Exception as e:
+            logger.debug(f"Error parsing Coles product: {e}")
+            continue
     
     return products
 
-async def scrape_woolworths_prices(query: str) -> List[Dict]:
-    """Scrape prices from Woolworths website"""
+def parse_woolworths_html_soup(html: str) -> List[Dict]:
+    """Extract up to 10 products from a Woolworths search results page with BeautifulSoup"""
     products = []
-    try:
-        search_url = f"https://www.woolworths.com.au/shop/search/products?searchTerm={query.replace(' ', '%20')}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-AU,en;q=0.9',
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(search_url, headers=headers, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    product_tiles = soup.select('.product-tile-v2') or soup.select('.shelfProductTile') or soup.select('[data-testid="product-tile"]')
-                    
-                    for tile in product_tiles[:10]:
-                        try:
-                            name_elem = tile.select_one('.product-title') or tile.select_one('.shelfProductTile-title') or tile.select_one('h3')
-                            price_elem = tile.select_one('.price') or tile.select_one('.product-price') or tile.select_one('[class*="price"]')
-                            
-                            if name_elem and price_elem:
-                                name = name_elem.get_text(strip=True)
-                                price_text = price_elem.get_text(strip=True)
-                                price_match = re.search(r'\$?(\d+\.?\d*)', price_text)
-                                
-                                if price_match:
-                                    price = float(price_match.group(1))
-                                    products.append({
-                                        "name": name,
-                                        "price": price,
-                                        "store": "woolworths",
-                                        "source": "scrape"
-                                    })
-                        except Exception as e:
-                            logger.debug(f"Error parsing Woolworths product: {e}")
-                            continue
-                            
-    except Exception as e:
-        logger.error(f"Error scraping Woolworths: {e}")
+    soup = BeautifulSoup(html, 'lxml')
+    
+    product_tiles = soup.select('.product-tile-v2') or soup.select('.shelfProductTile') or soup.select('[data-testid="product-tile"]')
+    
+    for tile in product_tiles[:10]:
+        try:
+            name_elem = tile.select_one('.product-title') or tile.select_one('.shelfProductTile-title') or tile.select_one('h3')
+            price_elem = tile.select_one('.price') or tile.select_one('.product-price') or tile.select_one('[class*="price"]')
+            
+            if name_elem and price_elem:
+                name = name_elem.get_text(strip=True)
+                price_text = price_elem.get_text(strip=True)
+                price_match = re.search(r'\$?(\d+\.?\d*)', price_text)
+                
+                if price_match:
+                    price = float(price_match.group(1))
+                    products.append({
+                        "name": name,
+                        "price": price,
+                        "store": "woolworths",
+                        "source": "scrape"
+                    })
+        except Exception as e:
+            logger.debug(f"Error parsing Woolworths product: {e}")
+            continue
     
     return products
 
-async def scrape_all_stores(query: str) -> Dict[str, List[Dict]]:
-    """Scrape prices from all Australian stores concurrently"""
+def _css_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+class FastTileExtractor:
+    """lxml extractor for a store's search results page.
+
+    Mirrors the BeautifulSoup selectors as precompiled XPath over a tree
+    built by libxml2, and only ever looks at the first ``limit`` tiles.
+    """
+
+    def __init__(self, store: str, tile_tests: List[str], name_paths: List[str], price_paths: List[str], limit: int = 10):
+        self.store = store
+        # Tile selectors in priority order, like `select(a) or select(b) or select(c)`
+        self.tile_paths = [etree.XPath(f"(//*[{test}])[position() <= {limit}]") for test in tile_tests]
+        self.name_paths = [etree.XPath(f"(.//*[{path}])[1]") for path in name_paths]
+        self.price_paths = [etree.XPath(f"(.//*[{path}])[1]") for path in price_paths]
+
+    def _first(self, node, paths):
+        for path in paths:
+            found = path(node)
+            if found:
+                return found
+        return []
+
+    def extract(self, html: str) -> List[Dict]:
+        products = []
+        root = etree.HTML(html)
+        if root is None:
+            return products
+        for tile in self._first(root, self.tile_paths):
+            name_elem = self._first(tile, self.name_paths)
+            price_elem = self._first(tile, self.price_paths)
+            if not name_elem or not price_elem:
+                continue
+            name = "".join(text.strip() for text in name_elem[0].itertext())
+            price_match = re.search(r'\$?(\d+\.?\d*)', "".join(text.strip() for text in price_elem[0].itertext()))
+            if price_match:
+                products.append({
+                    "name": name,
+                    "price": float(price_match.group(1)),
+                    "store": self.store,
+                    "source": "scrape"
+                })
+        return products
+
+COLES_EXTRACTOR = FastTileExtractor(
+    "coles",
+    tile_tests=['@data-testid="product-tile"', _css_class("product-tile"), _css_class("product")],
+    name_paths=['@data-testid="product-title"', _css_class("product-title"), "self::h3"],
+    price_paths=['@data-testid="product-price"', _css_class("price"), _css_class("product-price")],
+)
+
+WOOLWORTHS_EXTRACTOR = FastTileExtractor(
+    "woolworths",
+    tile_tests=[_css_class("product-tile-v2"), _css_class("shelfProductTile"), '@data-testid="product-tile"'],
+    name_paths=[_css_class("product-title"), _css_class("shelfProductTile-title"), "self::h3"],
+    price_paths=[_css_class("price"), _css_class("product-price"), "contains(@class, 'price')"],
+)
+
+ALDI_EXTRACTOR = FastTileExtractor(
+    "aldi",
+    tile_tests=[_css_class("product-tile")],
+    name_paths=[_css_class("product-tile__name"), "self::h3"],
+    price_paths=[_css_class("base-price__regular"), _css_class("base-price")],
+)
+
+IGA_EXTRACTOR = FastTileExtractor(
+    "iga",
+    tile_tests=['@data-testid="product-card"', _css_class("product-card")],
+    name_paths=['@data-testid="product-card-name"', _css_class("product-card-name")],
+    price_paths=['@data-testid="product-card-price"', _css_class("price")],
+)
+
+COSTCO_EXTRACTOR = FastTileExtractor(
+    "costco",
+    tile_tests=[_css_class("product-list-item"), _css_class("product-item")],
+    name_paths=[_css_class("product-name"), _css_class("description")],
+    price_paths=[_css_class("product-price-amount"), _css_class("price")],
+)
+
+class ParsePool:
+    """Worker pool that runs HTML extraction off the event loop.
+
+    ``kind`` is "thread", "process" or "none" (parse inline on the loop).
+    Process workers sidestep the GIL but pay to pickle each page across.
+    """
+
+    def __init__(self, kind: str = SCRAPER_PARSE_POOL, workers: int = SCRAPER_PARSE_WORKERS):
+        self.kind = kind
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+
+    def get(self) -> Optional[Executor]:
+        if self._executor is None and self.kind != "none":
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parse")
+        return self._executor
+
+    async def run(self, parse: Callable[..., List[Dict]], *args) -> List[Dict]:
+        executor = self.get()
+        if executor is None:
+            return parse(*args)
+        return await asyncio.get_running_loop().run_in_executor(executor, parse, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+parse_pool = ParsePool()
+
+# ============================================
+# WEB SCRAPING FOR AUSTRALIAN STORES
+# ============================================
+
+class StoreAdapter:
+    """Scrapes one store: fetch its search page, parse it, normalise the products.
+
+    ``search_path`` is appended to the store's URL from STORES and formatted
+    with the URL-quoted query. ``parse`` runs in the parse pool, so it must
+    be pure (html -> product dicts). ``fallback`` is tried when the fast
+    extractor finds nothing.
+    """
+
+    def __init__(self, key: str, search_path: str, extractor: FastTileExtractor, fallback: Optional[Callable[[str], List[Dict]]] = None, timeout: float = SCRAPER_TIMEOUT):
+        self.key = key
+        self.search_path = search_path
+        self.extractor = extractor
+        self.fallback = fallback
+        self.timeout = timeout
+
+    @property
+    def base_url(self) -> str:
+        return STORES[self.key]["url"]
+
+    def search_url(self, query: str) -> str:
+        return self.base_url + self.search_path.format(query=quote(query))
+
+    async def fetch(self, query: str) -> Optional[str]:
+        """The search page's HTML, or None if the store has no page for this search (a 4xx)"""
+        session = scraper_clients.get(self.base_url)
+        # The timeout is inside the guard so a hanging store counts as a failure
+        async with scrape_breakers[self.key].guard(), scrape_limiters[self.key].slot(), asyncio.timeout(self.timeout):
+            async with session.get(self.search_url(query)) as response:
+                if 400 <= response.status < 500 and response.status not in (408, 429):
+                    logger.debug(f"{STORES[self.key]['name']} answered HTTP {response.status} for {query!r}")
+                    return None
+                if response.status != 200:
+                    raise ScrapeFailed(f"HTTP {response.status}")
+                return await response.text()
+
+    def parse(self, html: str) -> List[Dict]:
+        products = []
+        try:
+            products = self.extractor.extract(html)
+        except Exception as e:
+            logger.debug(f"Fast {self.key} extractor failed: {e}")
+        if not products and self.fallback:
+            products = self.fallback(html)
+        return products
+
+    def normalise(self, products: List[Dict]) -> List[Dict]:
+        normalised = []
+        for product in products:
+            name = " ".join(str(product.get("name", "")).split())
+            price = product.get("price") or 0
+            if name and price > 0:
+                normalised.append({"name": name, "price": round(float(price), 2), "store": self.key, "source": "scrape"})
+        return normalised
+
+    async def scrape(self, query: str) -> List[Dict]:
+        try:
+            html = await self.fetch(query)
+            if html is None:
+                return []
+            return self.normalise(await parse_pool.run(parse_store_html, self.key, html))
+        except StoreUnavailable:
+            raise
+        except TimeoutError as e:
+            logger.warning(f"{STORES[self.key]['name']} scrape timed out after {self.timeout}s")
+            raise StoreTimedOut() from e
+        except Exception as e:
+            logger.error(f"Error scraping {STORES[self.key]['name']}: {e}")
+            raise StoreScrapeError(str(e)) from e
+
+# Registered adapters keyed like STORES; scrape_all_stores fans out to all of them
+STORE_ADAPTERS: Dict[str, StoreAdapter] = {}
+
+def register_adapter(adapter: StoreAdapter):
+    if adapter.key not in STORES:
+        raise ValueError(f"Unknown store: {adapter.key}")
+    STORE_ADAPTERS[adapter.key] = adapter
+
+def parse_store_html(store: str, html: str) -> List[Dict]:
+    """Module-level so process-pool workers can look the adapter up by key"""
+    return STORE_ADAPTERS[store].parse(html)
+
+register_adapter(StoreAdapter("coles", "/search?q={query}", COLES_EXTRACTOR, fallback=parse_coles_html_soup))
+register_adapter(StoreAdapter("woolworths", "/shop/search/products?searchTerm={query}", WOOLWORTHS_EXTRACTOR, fallback=parse_woolworths_html_soup))
+register_adapter(StoreAdapter("aldi", "/results?q={query}", ALDI_EXTRACTOR))
+register_adapter(StoreAdapter("iga", "/search?q={query}", IGA_EXTRACTOR))
+register_adapter(StoreAdapter("costco", "/search?text={query}", COSTCO_EXTRACTOR))
+
+def normalise_query(query: str) -> str:
+    """Collapse case and whitespace so equivalent searches share one scrape"""
+    return " ".join(query.lower().split())
+
+async def scrape_all_stores(query: str) -> Dict[str, Any]:
+    """Scrape prices from all Australian stores concurrently.
+
+    Returns {"data": {store: products}, "scraped_at": epoch seconds, "stale": bool}.
+    A stale cached result is returned immediately and refreshed in the background.
+    """
+    query = normalise_query(query)
     cache_key = f"scrape:{query}"
-    now = datetime.now(timezone.utc)
-    
-    if cache_key in price_cache:
-        cached = price_cache[cache_key]
-        if (now.timestamp() - cached["timestamp"]) < CACHE_DURATION:
-            return cached["data"]
     
-    coles_task = scrape_coles_prices(query)
-    woolworths_task = scrape_woolworths_prices(query)
+    cached = price_cache.lookup(cache_key)
+    if cached is None:
+        cached = await scrape_flights.do(cache_key, lambda: _load_or_scrape(query, cache_key))
     
-    results = await asyncio.gather(coles_task, woolworths_task, return_exceptions=True)
+    result, stale = cached
+    if stale:
+        scrape_flights.start(f"refresh:{cache_key}", lambda: _scrape_and_cache(query, cache_key))
+    return {**result, "stale": stale}
+
+async def _load_or_scrape(query: str, cache_key: str) -> Tuple[Dict[str, Any], bool]:
+    """Fill the in-memory tier from the shared Mongo tier, scraping only if both miss"""
+    shared = await shared_scrape_cache.get(cache_key)
+    if shared is not None:
+        return shared
+    return await _scrape_and_cache(query, cache_key), False
+
+async def _scrape_and_cache(query: str, cache_key: str) -> Dict[str, Any]:
+    adapters = list(STORE_ADAPTERS.values())
+    results = await asyncio.gather(*(adapter.scrape(query) for adapter in adapters), return_exceptions=True)
     
-    scraped_data = {
-        "coles": results[0] if isinstance(results[0], list) else [],
-        "woolworths": results[1] if isinstance(results[1], list) else []
-    }
+    # A store that was skipped (rate limited, circuit open) or failed (timeout,
+    # bad response) keeps whatever we last had for it, even if stale
+    previous = price_cache.peek(cache_key) or {}
+    unavailable = {}
+    scraped_data = {}
+    transient = False
+    for adapter, result in zip(adapters, results):
+        store = adapter.key
+        if isinstance(result, BaseException):
+            unavailable[store] = getattr(result, "reason", "error")
+            transient = transient or getattr(result, "transient", True)
+            scraped_data[store] = previous.get("data", {}).get(store, [])
+        else:
+            scraped_data[store] = result
     
-    price_cache[cache_key] = {
-        "data": scraped_data,
-        "timestamp": now.timestamp()
-    }
+    result = {"data": scraped_data, "scraped_at": time.time()}
+    if unavailable:
+        result["unavailable"] = unavailable
+    # Retry skipped or timed-out stores soon rather than pinning a partial result for an hour
+    ttl = SCRAPE_PARTIAL_TTL if transient else None
+    price_cache.set(cache_key, result, ttl=ttl)
+    await shared_scrape_cache.set(cache_key, result, ttl=ttl)
     
-    return scraped_data
+    return result
 
 # ============================================
 # EMAIL NOTIFICATIONS
 # ============================================
 
-async def send_price_alert_email(recipient_email: str, product_name: str, target_price: float, current_price: float, store_name: str):
-    """Send price drop alert email"""
-    if not RESEND_API_KEY:
-        logger.warning("Resend API key not configured, skipping email")
-        return False
-    
+def render_price_alert_email(recipient_email: str, product_name: str, target_price: float, current_price: float, store_name: str) -> Dict:
+    """Resend params for a single price drop alert"""
     html_content = f"""
     <!DOCTYPE html>
     <html>
@@ -257,56 +1013,182 @@ async def send_price_alert_email(recipient_email: str, product_name: str, target
     </body>
     </html>
     """
-    
-    try:
-        params = {
-            "from": SENDER_EMAIL,
-            "to": [recipient_email],
-            "subject": f"🎉 Price Drop: {product_name} is now ${current_price:.2f}!",
-            "html": html_content
+    return {
+        "from": SENDER_EMAIL,
+        "to": [recipient_email],
+        "subject": f"🎉 Price Drop: {product_name} is now ${current_price:.2f}!",
+        "html": html_content
+    }
+
+def render_price_alert_digest(recipient_email: str, items: List[Dict]) -> Dict:
+    """Resend params for one email covering several triggered alerts"""
+    rows = "".join(
+        f"""
+                    <div style="border-bottom: 1px solid #E4E4E7; padding: 12px 0;">
+                        <strong style="color: #333;">{item["product_name"]}</strong>
+                        <span style="font-family: monospace; font-weight: bold; color: #00E676; float: right;">${item["current_price"]:.2f}</span>
+                        <div style="color: #666; font-size: 14px;">at {item["store_name"]} · your target ${item["target_price"]:.2f}</div>
+                    </div>"""
+        for item in items
+    )
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    </head>
+    <body style="font-family: 'Manrope', Arial, sans-serif; background-color: #FAFAFA; margin: 0; padding: 20px;">
+        <div style="max-width: 600px; margin: 0 auto; background-color: white; border: 2px solid black; border-radius: 12px; overflow: hidden;">
+            <div style="background-color: #00E676; padding: 20px; text-align: center; border-bottom: 2px solid black;">
+                <h1 style="margin: 0; color: black; font-size: 24px;">🎉 {len(items)} Price Drops!</h1>
+            </div>
+            <div style="padding: 30px;">
+                <p style="color: #666; margin: 0 0 20px 0;">Products on your watchlist have dropped to your target price:</p>
+                <div style="background-color: #F4F4F5; border: 2px solid #E4E4E7; border-radius: 8px; padding: 8px 20px; margin: 20px 0;">{rows}
+                </div>
+            </div>
+            <div style="background-color: #F4F4F5; padding: 15px; text-align: center; border-top: 2px solid #E4E4E7;">
+                <p style="margin: 0; color: #666; font-size: 12px;">
+                    PricePantry - Compare grocery prices across Coles, Woolworths, Aldi, IGA & Costco
+                </p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+    return {
+        "from": SENDER_EMAIL,
+        "to": [recipient_email],
+        "subject": f"🎉 {len(items)} price drops on your watchlist",
+        "html": html_content
+    }
+
+class ResendTransport:
+    """Sends through the Resend SDK. Both calls block, so the dispatcher runs them in threads.
+
+    Resend drops a repeated request with the same ``idempotency_key`` for 24
+    hours, so a retried send is not delivered twice.
+    """
+
+    def send(self, params: Dict, idempotency_key: Optional[str] = None) -> Any:
+        return resend.Emails.send(params, {"idempotency_key": idempotency_key} if idempotency_key else None)
+
+    def send_batch(self, params: List[Dict], idempotency_key: Optional[str] = None) -> Any:
+        return resend.Batch.send(params, {"idempotency_key": idempotency_key} if idempotency_key else None)
+
+class EmailDispatcher:
+    """Sends price alert emails concurrently and in batches, one email per recipient.
+
+    Triggered alerts for the same address coalesce into a single digest.
+    The resulting messages go out through the transport's batch call in
+    chunks of ``batch_size``, with at most ``max_concurrency`` API calls in
+    flight. Without a transport (no RESEND_API_KEY) nothing is sent.
+    Given an ``idempotency_key``, the i-th API call carries
+    ``<idempotency_key>/<i>``, so dispatching the same notifications in the
+    same order again is a no-op at Resend.
+    """
+
+    def __init__(self, transport: Optional[Any], batch_size: int = EMAIL_BATCH_SIZE, max_concurrency: int = EMAIL_MAX_CONCURRENCY):
+        self.transport = transport
+        self.batch_size = batch_size
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.api_calls = 0
+        self.emails_sent = 0
+        self.alerts_sent = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.transport is not None
+
+    def plan(self, notifications: List[Dict]) -> List[List[Tuple[str, List[Dict]]]]:
+        """Split notifications into the groups sent by one API call each.
+
+        A group is up to ``batch_size`` (recipient, notifications) pairs, one
+        email each, so a recipient's alerts always go out together.
+        """
+        by_recipient: Dict[str, List[Dict]] = {}
+        for item in notifications:
+            by_recipient.setdefault(item["email"], []).append(item)
+        recipients = list(by_recipient.items())
+        return [recipients[i:i + self.batch_size] for i in range(0, len(recipients), self.batch_size)]
+
+    async def dispatch(self, notifications: List[Dict], idempotency_key: Optional[str] = None) -> Dict[str, bool]:
+        """Send notifications, each a dict of alert_id, email, product_name,
+        target_price, current_price and store_name. Returns alert_id -> sent.
+        """
+        if not notifications:
+            return {}
+        if self.transport is None:
+            logger.warning("Resend API key not configured, skipping email")
+            return {item["alert_id"]: False for item in notifications}
+        results: Dict[str, bool] = {}
+        await asyncio.gather(*(
+            self._send_group(group, results, f"{idempotency_key}/{i}" if idempotency_key else None)
+            for i, group in enumerate(self.plan(notifications))
+        ))
+        return results
+
+    async def _send_group(self, group: List[Tuple[str, List[Dict]]], results: Dict[str, bool], key: Optional[str]):
+        messages = []
+        for recipient, items in group:
+            if len(items) == 1:
+                item = items[0]
+                messages.append(render_price_alert_email(recipient, item["product_name"], item["target_price"], item["current_price"], item["store_name"]))
+            else:
+                messages.append(render_price_alert_digest(recipient, items))
+        async with self._slots:
+            try:
+                if len(messages) == 1:
+                    await asyncio.to_thread(self.transport.send, messages[0], key)
+                else:
+                    await asyncio.to_thread(self.transport.send_batch, messages, key)
+                ok = True
+                self.emails_sent += len(messages)
+                logger.info(f"Sent {len(messages)} price alert email(s)")
+            except Exception as e:
+                ok = False
+                self.failures += len(messages)
+                logger.error(f"Failed to send {len(messages)} price alert email(s): {e}")
+            finally:
+                self.api_calls += 1
+        notifications = [item for _, items in group for item in items]
+        results.update((item["alert_id"], ok) for item in notifications)
+        if ok:
+            self.alerts_sent += len(notifications)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "api_calls": self.api_calls,
+            "emails_sent": self.emails_sent,
+            "alerts_sent": self.alerts_sent,
+            "failures": self.failures,
         }
-        
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logger.info(f"Price alert email sent to {recipient_email}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send email: {e}")
-        return False
+
+email_dispatcher = EmailDispatcher(ResendTransport() if RESEND_API_KEY else None)
+
+# The alert engine keeps only what it needs to evaluate and notify
+ALERT_ENGINE_FIELDS = {"_id": 0, "id": 1, "product_id": 1, "product_name": 1, "target_price": 1, "email": 1}
 
 async def check_price_alerts_and_notify():
-    """Background task to check price alerts and send notifications"""
-    try:
-        alerts = await db.price_alerts.find({"triggered": False}, {"_id": 0}).to_list(100)
-        
-        for alert in alerts:
-            products = [p for p in MOCK_PRODUCTS if p["id"] == alert.get("product_id")]
-            if products:
-                product = products[0]
-                best_price = None
-                best_store = None
-                
-                for store, price_data in product.get("store_prices", {}).items():
-                    if price_data.get("available") and price_data.get("price", 0) > 0:
-                        if best_price is None or price_data["price"] < best_price:
-                            best_price = price_data["price"]
-                            best_store = STORES.get(store, {}).get("name", store)
-                
-                if best_price and best_price <= alert.get("target_price", 0):
-                    if alert.get("email"):
-                        await send_price_alert_email(
-                            alert["email"],
-                            alert["product_name"],
-                            alert["target_price"],
-                            best_price,
-                            best_store
-                        )
-                    
-                    await db.price_alerts.update_one(
-                        {"id": alert["id"]},
-                        {"$set": {"triggered": True, "triggered_at": datetime.now(timezone.utc).isoformat()}}
-                    )
-    except Exception as e:
-        logger.error(f"Error checking price alerts: {e}")
+    """Consistency pass: reload untriggered alerts into the alert engine and re-check them all.
+
+    Price changes are evaluated as they happen by ``alert_engine``; this
+    catches alerts created by other workers or missed events. Returns the
+    number of alerts checked.
+    """
+    cursor = db.price_alerts.find({"triggered": False}, ALERT_ENGINE_FIELDS, batch_size=ALERT_READ_BATCH)
+    return await alert_engine.reload(cursor)
+
+async def refresh_price_alerts() -> int:
+    """Reload untriggered alerts into the alert engine without firing any.
+
+    Workers that are not running the consistency pass use this to pick up
+    alerts created or deleted elsewhere. Returns the number of alerts read.
+    """
+    cursor = db.price_alerts.find({"triggered": False}, ALERT_ENGINE_FIELDS, batch_size=ALERT_READ_BATCH)
+    return await alert_engine.reload(cursor, fire=False)
 
 # ============================================
 # PRICE HISTORY GENERATION
@@ -579,7 +1461,1330 @@ def generate_mock_products():
     
     return result
 
-MOCK_PRODUCTS = generate_mock_products()
+# ============================================
+# PRODUCT CATALOG & SEARCH INDEXES
+# ============================================
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def searchable_text(product: Dict) -> str:
+    return f"{product.get('name', '')} {product.get('brand', '')}"
+
+def _intersect_sorted(small: List[int], large: List[int]) -> List[int]:
+    """Intersect two sorted posting lists by binary-searching the larger one"""
+    result = []
+    lo = 0
+    for ordinal in small:
+        lo = bisect_left(large, ordinal, lo)
+        if lo == len(large):
+            break
+        if large[lo] == ordinal:
+            result.append(ordinal)
+    return result
+
+class TokenIndex:
+    """Inverted index from name/brand tokens to sorted lists of product ordinals.
+
+    A query term matches every indexed token it is a prefix of, so partly
+    typed words still find products. Multi-term queries intersect the
+    per-term posting lists, smallest first.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, List[int]] = {}
+        self._vocab: List[str] = []  # sorted, for prefix lookups
+        self._doc_tokens: Dict[int, set] = {}
+
+    def build(self, texts: List[str]):
+        """Bulk-load texts for ordinals 0..n-1, replacing any existing contents"""
+        self._postings = {}
+        self._doc_tokens = {}
+        for ordinal, text in enumerate(texts):
+            tokens = set(tokenize(text))
+            self._doc_tokens[ordinal] = tokens
+            for token in tokens:
+                self._postings.setdefault(token, []).append(ordinal)
+        self._vocab = sorted(self._postings)
+
+    def add(self, ordinal: int, text: str):
+        tokens = set(tokenize(text))
+        self._doc_tokens[ordinal] = tokens
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = [ordinal]
+                insort(self._vocab, token)
+            else:
+                insort(postings, ordinal)
+
+    def remove(self, ordinal: int):
+        for token in self._doc_tokens.pop(ordinal, ()):
+            postings = self._postings[token]
+            del postings[bisect_left(postings, ordinal)]
+            if not postings:
+                del self._postings[token]
+                del self._vocab[bisect_left(self._vocab, token)]
+
+    def update(self, ordinal: int, text: str):
+        self.remove(ordinal)
+        self.add(ordinal, text)
+
+    def _term_postings(self, term: str) -> List[int]:
+        matched = []
+        for i in range(bisect_left(self._vocab, term), len(self._vocab)):
+            token = self._vocab[i]
+            if not token.startswith(term):
+                break
+            matched.append(self._postings[token])
+        if len(matched) <= 1:
+            return matched[0] if matched else []
+        return sorted(set().union(*matched))
+
+    def search(self, query: str) -> List[int]:
+        """Ordinals of products whose name/brand match every query term, in catalog order"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        lists = sorted((self._term_postings(term) for term in terms), key=len)
+        result = lists[0]
+        for postings in lists[1:]:
+            if not result:
+                break
+            result = _intersect_sorted(result, postings)
+        return result
+
+def substring_text(product: Dict) -> str:
+    # NUL keeps a match from spanning the end of the name and the start of the brand
+    return f"{product.get('name', '')}\x00{product.get('brand', '')}".lower()
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _indexed_grams(text: str) -> set:
+    """Trigrams plus every 1- and 2-character substring, so short queries are a single lookup"""
+    return _trigrams(text) | {text[i:i + n] for n in (1, 2) for i in range(len(text) - n + 1)}
+
+class TrigramIndex:
+    """Character-trigram index over lowercased name/brand text.
+
+    Substring queries intersect the posting lists of the query's trigrams,
+    then confirm each candidate with a real ``in`` test. Results therefore
+    match a linear substring scan. Queries shorter than three characters
+    have no trigram, so single characters and bigrams get posting lists
+    of their own; those are exact answers and need no confirmation. Fuzzy
+    queries rank products by the share of the query's trigrams they
+    contain, so a typo such as "bannana" still finds bananas.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, List[int]] = {}
+        self._texts: Dict[int, str] = {}
+
+    def build(self, texts: List[str]):
+        """Bulk-load texts for ordinals 0..n-1, replacing any existing contents"""
+        self._postings = {}
+        self._texts = {}
+        for ordinal, text in enumerate(texts):
+            self._texts[ordinal] = text
+            for gram in _indexed_grams(text):
+                self._postings.setdefault(gram, []).append(ordinal)
+
+    def add(self, ordinal: int, text: str):
+        self._texts[ordinal] = text
+        for gram in _indexed_grams(text):
+            insort(self._postings.setdefault(gram, []), ordinal)
+
+    def remove(self, ordinal: int):
+        text = self._texts.pop(ordinal, None)
+        if text is None:
+            return
+        for gram in _indexed_grams(text):
+            postings = self._postings[gram]
+            del postings[bisect_left(postings, ordinal)]
+            if not postings:
+                del self._postings[gram]
+
+    def update(self, ordinal: int, text: str):
+        self.remove(ordinal)
+        self.add(ordinal, text)
+
+    def search(self, query: str) -> List[int]:
+        """Ordinals whose text contains query as a substring, in catalog order"""
+        query = query.lower()
+        if not query:
+            return sorted(self._texts)
+        if len(query) < 3:
+            return list(self._postings.get(query, ()))
+        lists = []
+        for gram in _trigrams(query):
+            postings = self._postings.get(gram)
+            if not postings:
+                return []
+            lists.append(postings)
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for postings in lists[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(postings)
+        return sorted(ordinal for ordinal in candidates if query in self._texts[ordinal])
+
+    def fuzzy(self, query: str, min_similarity: float = 0.5) -> List[int]:
+        """Ordinals sharing at least min_similarity of the query's trigrams, best first"""
+        grams = _trigrams(query.lower())
+        if not grams:
+            return self.search(query)
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+        needed = min_similarity * len(grams)
+        matches = [ordinal for ordinal, count in shared.items() if count >= needed]
+        # More shared trigrams first, then shorter (more specific) texts
+        matches.sort(key=lambda ordinal: (-shared[ordinal], len(self._texts[ordinal]), ordinal))
+        return matches
+
+class PriceMatrix:
+    """Catalog prices stored as columns, with one row per product ordinal and
+    one column per store (in ``stores`` order).
+
+    ``prices`` is a float32 matrix with NaN where a store lists no price.
+    Alongside it are boolean ``available`` and ``on_special`` matrices and
+    integer-coded ``categories`` and ``brands``. Best price and best store
+    are reduced across each row when it is written. Catalog-wide filters,
+    reductions and sorts therefore run as NumPy operations and never walk
+    ``store_prices`` dicts. Price bounds are compared as float32 so that an
+    inclusive bound equal to a listed price still matches. Storage grows
+    by doubling; the public arrays are views trimmed to ``len(self)``.
+    """
+
+    def __init__(self, stores: List[str]):
+        self.stores = list(stores)
+        self._columns = {store: i for i, store in enumerate(self.stores)}
+        self._labels: Dict[str, List[str]] = {"category": [], "brand": []}
+        self._codes: Dict[str, Dict[str, int]] = {"category": {}, "brand": {}}
+        self._size = 0
+        self._prices = np.empty((0, len(self.stores)), dtype=np.float32)
+        self._available = np.empty((0, len(self.stores)), dtype=bool)
+        self._on_special = np.empty((0, len(self.stores)), dtype=bool)
+        self._categories = np.empty(0, dtype=np.int32)
+        self._brands = np.empty(0, dtype=np.int32)
+        self._best_prices = np.empty(0, dtype=np.float32)
+        self._best_stores = np.empty(0, dtype=np.int8)
+        self._price_order = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    prices = property(lambda self: self._prices[:self._size])
+    available = property(lambda self: self._available[:self._size])
+    on_special = property(lambda self: self._on_special[:self._size])
+    categories = property(lambda self: self._categories[:self._size])
+    brands = property(lambda self: self._brands[:self._size])
+    best_prices = property(lambda self: self._best_prices[:self._size])
+    best_stores = property(lambda self: self._best_stores[:self._size])
+
+    def column(self, store: str) -> int:
+        return self._columns[store]
+
+    def code(self, kind: str, label: str) -> int:
+        """Integer code for a category or brand, or -1 if no product has it"""
+        return self._codes[kind].get(label, -1)
+
+    def _encode(self, kind: str, label: str) -> int:
+        code = self._codes[kind].get(label)
+        if code is None:
+            code = self._codes[kind][label] = len(self._labels[kind])
+            self._labels[kind].append(label)
+        return code
+
+    def _row(self, product: Dict):
+        prices = [np.nan] * len(self.stores)
+        available = [False] * len(self.stores)
+        on_special = [False] * len(self.stores)
+        for store, sp in product.get("store_prices", {}).items():
+            col = self._columns.get(store)
+            if col is not None:
+                prices[col] = sp.get("price", np.nan)
+                available[col] = bool(sp.get("available"))
+                on_special[col] = bool(sp.get("on_special"))
+        return prices, available, on_special, self._encode("category", product["category"]), self._encode("brand", product["brand"])
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self._best_prices):
+            return
+        capacity = max(capacity, 2 * len(self._best_prices))
+        for name in ("_prices", "_available", "_on_special", "_categories", "_brands", "_best_prices", "_best_stores"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _reduce(self, start: int, stop: int):
+        prices = self._prices[start:stop]
+        usable = self._available[start:stop] & (prices > 0)
+        masked = np.where(usable, prices, np.float32(np.inf))
+        self._best_prices[start:stop] = masked.min(axis=1)
+        self._best_stores[start:stop] = np.where(usable.any(axis=1), masked.argmin(axis=1), -1)
+        self._price_order = None
+
+    def load(self, products: List[Dict]):
+        rows = [self._row(product) for product in products]
+        start = self._size
+        self._reserve(start + len(rows))
+        self._size = stop = start + len(rows)
+        if rows:
+            prices, available, on_special, categories, brands = zip(*rows)
+            self._prices[start:stop] = prices
+            self._available[start:stop] = available
+            self._on_special[start:stop] = on_special
+            self._categories[start:stop] = categories
+            self._brands[start:stop] = brands
+        self._reduce(start, stop)
+
+    def set_row(self, ordinal: int, product: Dict):
+        """Write one product's row; ordinal == len(self) appends"""
+        if ordinal == self._size:
+            self._reserve(ordinal + 1)
+            self._size += 1
+        prices, available, on_special, category, brand = self._row(product)
+        self._prices[ordinal] = prices
+        self._available[ordinal] = available
+        self._on_special[ordinal] = on_special
+        self._categories[ordinal] = category
+        self._brands[ordinal] = brand
+        self._reduce(ordinal, ordinal + 1)
+
+    def best_store(self, ordinal: int) -> Optional[str]:
+        """Store key with the best price for one product, or None if nothing stocks it"""
+        col = int(self._best_stores[ordinal])
+        return self.stores[col] if col >= 0 else None
+
+    def price_order(self) -> np.ndarray:
+        """Ordinals sorted by best price, ties in catalog order (cached until a row changes)"""
+        if self._price_order is None:
+            self._price_order = np.argsort(self.best_prices, kind="stable")
+            self._sorted_prices = self.best_prices[self._price_order]
+        return self._price_order
+
+    def price_range(self, min_price: Optional[float] = None, max_price: Optional[float] = None) -> np.ndarray:
+        """Ordinals with min_price <= best price <= max_price, cheapest first"""
+        order = self.price_order()
+        lo = 0 if min_price is None else np.searchsorted(self._sorted_prices, np.float32(min_price), "left")
+        hi = len(order) if max_price is None else np.searchsorted(self._sorted_prices, np.float32(max_price), "right")
+        return order[lo:hi]
+
+class FacetIndex:
+    """Secondary index from one product attribute's values to sorted lists of ordinals.
+
+    ``values_of`` returns the values a product is filed under, so one
+    product can sit under several (e.g. every store that stocks it).
+    """
+
+    def __init__(self, values_of: Callable[[Dict], List[str]]):
+        self.values_of = values_of
+        self._postings: Dict[str, List[int]] = {}
+
+    def add(self, ordinal: int, product: Dict):
+        for value in self.values_of(product):
+            insort(self._postings.setdefault(value, []), ordinal)
+
+    def remove(self, ordinal: int, product: Dict):
+        for value in self.values_of(product):
+            postings = self._postings.get(value, [])
+            i = bisect_left(postings, ordinal)
+            if i < len(postings) and postings[i] == ordinal:
+                del postings[i]
+                if not postings:
+                    del self._postings[value]
+
+    def update(self, ordinal: int, old: Dict, new: Dict):
+        self.remove(ordinal, old)
+        self.add(ordinal, new)
+
+    def get(self, value: str) -> List[int]:
+        """Ordinals filed under value, in catalog order"""
+        return self._postings.get(value, [])
+
+    def counts(self) -> Dict[str, int]:
+        return {value: len(postings) for value, postings in self._postings.items()}
+
+def _available_stores(product: Dict) -> List[str]:
+    return [store for store, sp in product.get("store_prices", {}).items() if sp.get("available")]
+
+def _word_suffixes(text: str) -> List[str]:
+    """'Cavendish Bananas' -> ['cavendish bananas', 'bananas'], so completions match any word start"""
+    words = text.lower().split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+class AutocompleteIndex:
+    """Prefix completion over product names, brands and categories.
+
+    Every word-start suffix of every label is a key in one sorted array, so
+    a prefix maps to a contiguous range found with two bisects. Each row
+    carries a numeric sort key for both orderings: cheapest price first, or
+    popularity (views for products, product count for brands and
+    categories) with price as the tie-break. Equal prices fall back to
+    label order. Top-k is then a single ``heapq.nsmallest`` over the range.
+    View counts are folded into the popularity keys at most every
+    POPULARITY_REFRESH seconds. Short prefixes have the widest ranges, so
+    their results are cached until the keys change.
+
+    A price change re-keys only the product's own rows and the rows of its
+    brand and category (``reprice``). New or relabelled products need a
+    rebuild (``mark_dirty``), which runs in a worker thread while lookups
+    keep using the current index, or on the next lookup when there is no
+    event loop.
+    """
+
+    CACHED_PREFIX_LEN = 3
+    POPULARITY_REFRESH = 60
+    UNPRICED = 1e7  # stands in for "no price" in popularity keys
+    POPULARITY_SCALE = 1e8  # one view (or product) outweighs any price difference
+
+    def __init__(self, catalog: "ProductCatalog"):
+        self.catalog = catalog
+        self._built = False
+        self._dirty = True
+        self._rebuild: Optional[asyncio.Task] = None
+        self._repriced: set = set()  # ordinals repriced while a rebuild was running
+        # Parallel per-row arrays, sorted by key; see _compute
+        self._keys: List[str] = []
+        self._rows: List[Tuple[str, str, int]] = []  # (kind, label, ordinal)
+        self._group_sizes: List[int] = []  # products in a brand or category row's group, 0 for product rows
+        self._tiebreaks: List[float] = []
+        self._price_keys: List[float] = []
+        self._popularity_keys: List[float] = []
+        # What reprice needs to find the rows that depend on one product
+        self._product_rows: Dict[int, List[int]] = {}
+        self._group_rows: Dict[Tuple[str, str], List[int]] = {}
+        self._group_ordinals: Dict[Tuple[str, str], np.ndarray] = {}
+        # Results for prefixes up to CACHED_PREFIX_LEN, per ranking
+        self._price_cache: Dict[str, List] = {}
+        self._popularity_cache: Dict[str, List] = {}
+        self._popularity_at = 0.0
+
+    def mark_dirty(self):
+        self._dirty = True
+        if not self._built or self._rebuild is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._rebuild = loop.create_task(self._rebuild_in_background())
+
+    async def _rebuild_in_background(self):
+        try:
+            while self._dirty:
+                self._dirty = False
+                self._repriced = set()
+                state = await asyncio.to_thread(self._compute, *self._snapshot())
+                if not self._dirty:
+                    self._install(state)
+        except Exception as e:
+            # Leave it dirty so the next lookup rebuilds inline
+            self._dirty = True
+            logger.error(f"Autocomplete rebuild failed: {e}")
+        finally:
+            self._rebuild = None
+        # Price changes that landed after the snapshot
+        for ordinal in self._repriced:
+            self.reprice(ordinal)
+        self._repriced = set()
+
+    def build(self):
+        self._install(self._compute(*self._snapshot()))
+        self._dirty = False
+
+    def _snapshot(self) -> Tuple[List[Dict], np.ndarray]:
+        return list(self.catalog.products), self.catalog.prices.best_prices.copy()
+
+    @staticmethod
+    def _compute(products: List[Dict], prices: np.ndarray) -> Dict[str, Any]:
+        """Build the index from a snapshot; touches nothing shared, so it can run in a thread"""
+        rows = []
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for ordinal, product in enumerate(products):
+            for key in _word_suffixes(product["name"]):
+                rows.append((key, "product", product["name"], ordinal, 0))
+            for kind in ("brand", "category"):
+                groups.setdefault((kind, product[kind]), []).append(ordinal)
+        # Brands and categories point at their cheapest product
+        group_ordinals = {group: np.array(ordinals) for group, ordinals in groups.items()}
+        for (kind, label), ordinals in group_ordinals.items():
+            cheapest = int(ordinals[np.argmin(prices[ordinals])])
+            for key in _word_suffixes(label):
+                rows.append((key, kind, label, cheapest, len(ordinals)))
+        rows.sort()
+        labels = sorted({row[2] for row in rows})
+        # Offsets below a cent, so label order only breaks exact price ties
+        tiebreaks = {label: 1e-3 * i / len(labels) for i, label in enumerate(labels)}
+        product_rows: Dict[int, List[int]] = {}
+        group_rows: Dict[Tuple[str, str], List[int]] = {}
+        for position, (_, kind, label, ordinal, _) in enumerate(rows):
+            if kind == "product":
+                product_rows.setdefault(ordinal, []).append(position)
+            else:
+                group_rows.setdefault((kind, label), []).append(position)
+        row_prices = prices[[row[3] for row in rows]].tolist() if rows else []
+        return {
+            "keys": [row[0] for row in rows],
+            "rows": [(kind, label, ordinal) for _, kind, label, ordinal, _ in rows],
+            "group_sizes": [row[4] for row in rows],
+            "tiebreaks": [tiebreaks[row[2]] for row in rows],
+            "price_keys": [price + tiebreaks[row[2]] for price, row in zip(row_prices, rows)],
+            "product_rows": product_rows,
+            "group_rows": group_rows,
+            "group_ordinals": group_ordinals,
+        }
+
+    def _install(self, state: Dict[str, Any]):
+        self._keys = state["keys"]
+        self._rows = state["rows"]
+        self._group_sizes = state["group_sizes"]
+        self._tiebreaks = state["tiebreaks"]
+        self._price_keys = state["price_keys"]
+        self._product_rows = state["product_rows"]
+        self._group_rows = state["group_rows"]
+        self._group_ordinals = state["group_ordinals"]
+        self._built = True
+        self._refresh_popularity()
+        self._price_cache = {}
+
+    def _refresh_popularity(self):
+        views = self.catalog.views
+        unpriced, scale = self.UNPRICED, self.POPULARITY_SCALE
+        self._popularity_keys = [
+            min(price_key, unpriced) - scale * (group_size or views[ordinal])
+            for (_, _, ordinal), group_size, price_key in zip(self._rows, self._group_sizes, self._price_keys)
+        ]
+        self._popularity_cache = {}
+        self._popularity_at = time.monotonic()
+
+    def reprice(self, ordinal: int):
+        """Re-key the rows that depend on one product's best price"""
+        if not self._built:
+            return
+        if self._rebuild is not None:
+            self._repriced.add(ordinal)
+        product = self.catalog.products[ordinal]
+        prices = self.catalog.prices.best_prices
+        views = self.catalog.views
+        positions = [(position, ordinal) for position in self._product_rows.get(ordinal, ())]
+        for group in (("brand", product["brand"]), ("category", product["category"])):
+            ordinals = self._group_ordinals.get(group)
+            if ordinals is None:
+                continue
+            cheapest = int(ordinals[np.argmin(prices[ordinals])])
+            for position in self._group_rows[group]:
+                self._rows[position] = (group[0], group[1], cheapest)
+                positions.append((position, cheapest))
+        for position, row_ordinal in positions:
+            price_key = float(prices[row_ordinal]) + self._tiebreaks[position]
+            self._price_keys[position] = price_key
+            popularity = self._group_sizes[position] or views[row_ordinal]
+            self._popularity_keys[position] = min(price_key, self.UNPRICED) - self.POPULARITY_SCALE * popularity
+        self._price_cache.clear()
+        self._popularity_cache.clear()
+
+    def complete(self, prefix: str, k: int = 8, rank: str = "popularity") -> List[Tuple[str, str, int]]:
+        """Top-k (kind, label, ordinal) completions for prefix, best first"""
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        if not self._built or (self._dirty and self._rebuild is None):
+            self.build()
+        if rank == "price":
+            ranks, cache = self._price_keys, self._price_cache
+        else:
+            if time.monotonic() - self._popularity_at > self.POPULARITY_REFRESH:
+                self._refresh_popularity()
+            ranks, cache = self._popularity_keys, self._popularity_cache
+        cached = cache.get(prefix)
+        if cached is not None and len(cached) >= k:
+            return cached[:k]
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff", lo)
+        # Several rows can carry the same label; widen until k distinct survive
+        wanted = k
+        while True:
+            results, seen = [], set()
+            for i in heapq.nsmallest(wanted, range(lo, hi), key=ranks.__getitem__):
+                kind, label, ordinal = self._rows[i]
+                if (kind, label) not in seen:
+                    seen.add((kind, label))
+                    results.append((kind, label, ordinal))
+            if len(results) >= k or wanted >= hi - lo:
+                break
+            wanted *= 4
+        results = results[:k]
+        if len(prefix) <= self.CACHED_PREFIX_LEN:
+            cache[prefix] = results
+        return results
+
+class ProductCatalog:
+    """Products addressed by a stable ordinal, plus the indexes built over them.
+
+    Add or change products through ``upsert`` so every index stays in step
+    with ``products``. ``version`` increases on every change. ``get`` looks
+    a product up by id in O(1), and ``facets`` file ordinals by category,
+    brand and available store. Prices live
+    in ``prices``, a PriceMatrix with a row per ordinal; ``select`` and
+    ``order_by`` work on ordinal arrays, so only the page that is returned
+    goes back to product dicts.
+    """
+
+    def __init__(self, products: List[Dict]):
+        self.products: List[Dict] = []
+        self.version = 0
+        self._ordinals: Dict[str, int] = {}
+        self.text_index = TokenIndex()
+        self.substring_index = TrigramIndex()
+        self.autocomplete = AutocompleteIndex(self)
+        self.prices = PriceMatrix(list(STORES))
+        self.facets = {
+            "category": FacetIndex(lambda product: [product["category"]]),
+            "brand": FacetIndex(lambda product: [product["brand"]]),
+            "store": FacetIndex(_available_stores),
+        }
+        self.views: List[int] = []
+        self._names = None
+        self._sorted_views: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # Called with the ordinal whenever upsert changes a product's best price
+        self.price_listeners: List[Callable[[int], None]] = []
+        for product in products:
+            ordinal = self._ordinals[product["id"]] = len(self.products)
+            self.products.append(product)
+            self.views.append(0)
+            for facet in self.facets.values():
+                facet.add(ordinal, product)
+        self.text_index.build([searchable_text(product) for product in self.products])
+        self.substring_index.build([substring_text(product) for product in self.products])
+        self.prices.load(self.products)
+        self.autocomplete.build()
+
+    def upsert(self, product: Dict) -> int:
+        ordinal = self._ordinals.get(product["id"])
+        old_best = float('inf') if ordinal is None else float(self.prices.best_prices[ordinal])
+        relabelled = True
+        if ordinal is None:
+            ordinal = len(self.products)
+            self.products.append(product)
+            self.views.append(0)
+            self._ordinals[product["id"]] = ordinal
+            self.text_index.add(ordinal, searchable_text(product))
+            self.substring_index.add(ordinal, substring_text(product))
+            for facet in self.facets.values():
+                facet.add(ordinal, product)
+        else:
+            old, self.products[ordinal] = self.products[ordinal], product
+            relabelled = any(old.get(field) != product.get(field) for field in ("name", "brand", "category"))
+            for facet in self.facets.values():
+                facet.update(ordinal, old, product)
+            self.text_index.update(ordinal, searchable_text(product))
+            self.substring_index.update(ordinal, substring_text(product))
+        self.prices.set_row(ordinal, product)
+        repriced = float(self.prices.best_prices[ordinal]) != old_best
+        if relabelled:
+            self.autocomplete.mark_dirty()
+        elif repriced:
+            self.autocomplete.reprice(ordinal)
+        self._names = None
+        self._sorted_views.clear()
+        self.version += 1
+        if repriced:
+            for listener in self.price_listeners:
+                listener(ordinal)
+        return ordinal
+
+    def ordinal(self, product_id: str) -> Optional[int]:
+        return self._ordinals.get(product_id)
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        ordinal = self._ordinals.get(product_id)
+        return None if ordinal is None else self.products[ordinal]
+
+    def ids(self, facet: str, value: str) -> List[str]:
+        """Ids of products filed under value in one of ``facets``"""
+        return [self.products[ordinal]["id"] for ordinal in self.facets[facet].get(value)]
+
+    def best_price(self, ordinal: int) -> Tuple[float, Optional[str]]:
+        """(best price, best store key), with the price as listed rather than float32"""
+        store = self.prices.best_store(ordinal)
+        if store is None:
+            return float('inf'), None
+        return self.products[ordinal]["store_prices"][store]["price"], store
+
+    def record_view(self, product_id: str):
+        ordinal = self._ordinals.get(product_id)
+        if ordinal is not None:
+            self.views[ordinal] += 1
+
+    def search_ordinals(self, query: str, fuzzy: bool = False) -> List[int]:
+        """Match query against name/brand.
+
+        The default mode returns substring matches plus products matching
+        every query word, in catalog order. Fuzzy mode returns products
+        ranked by trigram similarity.
+        """
+        if fuzzy:
+            return self.substring_index.fuzzy(query)
+        substring = self.substring_index.search(query)
+        words = self.text_index.search(query)
+        if not words:
+            return substring
+        return sorted(set(substring).union(words))
+
+    def search_text(self, query: str, fuzzy: bool = False) -> List[Dict]:
+        return [self.products[ordinal] for ordinal in self.search_ordinals(query, fuzzy)]
+
+    def select(
+        self,
+        category: Optional[str] = None,
+        store: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        on_special: bool = False,
+    ) -> np.ndarray:
+        """Boolean mask over ordinals for the given filters"""
+        prices = self.prices
+        mask = np.ones(len(prices), dtype=bool)
+        if category is not None:
+            mask &= prices.categories == prices.code("category", category)
+        if store is not None:
+            mask &= prices.available[:, prices.column(store)]
+        if min_price is not None:
+            mask &= prices.best_prices >= np.float32(min_price)
+        if max_price is not None:
+            mask &= prices.best_prices <= np.float32(max_price)
+        if on_special:
+            mask &= prices.on_special.any(axis=1)
+        return mask
+
+    def sort_keys(self, sort_by: str) -> np.ndarray:
+        """Per-ordinal sort keys: best price, lowercased name, or the ordinal itself"""
+        if sort_by == "best_price":
+            return self.prices.best_prices
+        if sort_by == "name":
+            if self._names is None:
+                self._names = np.array([product.get("name", "").lower() for product in self.products])
+            return self._names
+        return np.arange(len(self.products))
+
+    def order_by(self, ordinals: np.ndarray, sort_by: str) -> np.ndarray:
+        """Stable sort of ordinals by best price or by lowercased name"""
+        if sort_by not in ("best_price", "name"):
+            return ordinals
+        return ordinals[np.argsort(self.sort_keys(sort_by)[ordinals], kind="stable")]
+
+    def sorted_view(self, sort_by: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(every ordinal in sort order, their keys), ties in catalog order; cached until the catalog changes"""
+        view = self._sorted_views.get(sort_by)
+        if view is None:
+            keys = self.sort_keys(sort_by)
+            order = np.argsort(keys, kind="stable")
+            view = self._sorted_views[sort_by] = (order, keys[order])
+        return view
+
+    def seek(self, sort_by: str, key: Any, ordinal: int) -> int:
+        """Position in sorted_view(sort_by) just after (key, ordinal)"""
+        order, keys = self.sorted_view(sort_by)
+        lo = int(np.searchsorted(keys, key, "left"))
+        hi = int(np.searchsorted(keys, key, "right"))
+        return lo + int(np.searchsorted(order[lo:hi], ordinal, "right"))
+
+    def page(self, ordinals, start: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Product dicts for ordinals[start:start + limit], from an array or list of ordinals"""
+        stop = None if limit is None else start + limit
+        window = ordinals[start:stop]
+        if isinstance(window, np.ndarray):
+            window = window.tolist()
+        return [self.products[ordinal] for ordinal in window]
+
+catalog = ProductCatalog(generate_mock_products())
+MOCK_PRODUCTS = catalog.products
+
+# ============================================
+# PRICE ALERT ENGINE
+# ============================================
+
+class AlertEngine:
+    """Untriggered price alerts indexed by product, with targets sorted ascending.
+
+    An alert fires once its product's best price is at or below its target.
+    When a product's best price changes, only that product's targets are
+    walked: every target from the bisect point of the new price upward
+    fires, and nothing else is looked at. Fired alerts leave the index
+    before ``notify`` runs, so each fires once per process. The periodic
+    consistency pass (``check_price_alerts_and_notify``) reloads the index
+    from Mongo and catches anything an event missed.
+    """
+
+    def __init__(self, catalog: ProductCatalog, notify: Callable[[List[Tuple[Dict, float, Optional[str]]]], Awaitable[None]]):
+        self.catalog = catalog
+        self.notify = notify
+        self._targets: Dict[str, List[Tuple[float, str]]] = {}  # product_id -> sorted (target_price, alert id)
+        self._alerts: Dict[str, Dict] = {}
+        self._firing: set = set()  # ids handed to notify and not yet confirmed
+        self._pending: List[Tuple[Dict, float, Optional[str]]] = []
+        self._removed: Optional[set] = None  # ids deleted while a reload is streaming
+        self._tasks: set = set()
+        self.fired = 0
+        catalog.price_listeners.append(self.on_price_change)
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def _index(self, alert: Dict):
+        self._alerts[alert["id"]] = alert
+        insort(self._targets.setdefault(alert["product_id"], []), (alert["target_price"], alert["id"]))
+
+    def add(self, alert: Dict) -> List[Dict]:
+        """Index one untriggered alert and check it against the current price straight away"""
+        if alert["id"] in self._alerts or alert["id"] in self._firing:
+            return []
+        self._index(alert)
+        return self.evaluate(alert["product_id"])
+
+    def remove(self, alert_id: str):
+        if self._removed is not None:
+            self._removed.add(alert_id)
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return
+        targets = self._targets[alert["product_id"]]
+        del targets[bisect_left(targets, (alert["target_price"], alert_id))]
+        if not targets:
+            del self._targets[alert["product_id"]]
+
+    async def reload(self, alerts: AsyncIterator[Dict], fire: bool = True) -> int:
+        """Rebuild the index from a stream of untriggered alerts, firing as it goes.
+
+        Each alert is checked against its product's price as it arrives, so
+        nothing but the index is held in memory. Fired alerts are handed to
+        ``notify`` in chunks of ALERT_WRITE_BATCH. With ``fire=False`` every
+        alert is indexed and nothing fires here. Alerts added or removed
+        while the stream is read are carried over into the new index.
+        Returns the number of alerts read.
+        """
+        live_targets, live_alerts = self._targets, self._alerts
+        self._targets, self._alerts = {}, {}
+        self._removed: set = set()
+        fired, seen = [], 0
+        try:
+            async for alert in alerts:
+                seen += 1
+                if alert["id"] in self._firing or alert["id"] in self._removed or alert["id"] in self._alerts:
+                    continue
+                if not fire:
+                    self._index(alert)
+                    continue
+                ordinal = self.catalog.ordinal(alert["product_id"])
+                price, store = self.catalog.best_price(ordinal) if ordinal is not None else (float('inf'), None)
+                if price <= alert["target_price"]:
+                    fired.append((alert, price, store))
+                    if len(fired) >= ALERT_WRITE_BATCH:
+                        self._dispatch(fired)
+                        fired = []
+                else:
+                    self._index(alert)
+        except BaseException:
+            self._targets, self._alerts = live_targets, live_alerts
+            raise
+        finally:
+            removed, self._removed = self._removed, None
+        for alert_id in removed:
+            self.remove(alert_id)
+        if fired:
+            self._dispatch(fired)
+        return seen
+
+    def on_price_change(self, ordinal: int):
+        self.evaluate(self.catalog.products[ordinal]["id"])
+
+    def evaluate(self, product_id: str) -> List[Dict]:
+        """Fire every alert on product_id whose target is at or above its best price"""
+        targets = self._targets.get(product_id)
+        ordinal = self.catalog.ordinal(product_id)
+        if not targets or ordinal is None:
+            return []
+        price, store = self.catalog.best_price(ordinal)
+        cut = bisect_left(targets, (price, ""))
+        if cut == len(targets):
+            return []
+        fired = [self._alerts.pop(alert_id) for _, alert_id in targets[cut:]]
+        del targets[cut:]
+        if not targets:
+            del self._targets[product_id]
+        self._dispatch([(alert, price, store) for alert in fired])
+        return fired
+
+    def _dispatch(self, fired: List[Tuple[Dict, float, Optional[str]]]):
+        self.fired += len(fired)
+        self._firing.update(alert["id"] for alert, _, _ in fired)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Price changed outside the event loop; notify on the next drain()
+            self._pending.extend(fired)
+            return
+        task = loop.create_task(self._notify(fired))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _notify(self, fired: List[Tuple[Dict, float, Optional[str]]]):
+        try:
+            await self.notify(fired)
+        finally:
+            self._firing.difference_update(alert["id"] for alert, _, _ in fired)
+
+    async def drain(self):
+        """Send anything pending and wait for notifications already handed off"""
+        if self._pending:
+            fired, self._pending = self._pending, []
+            await self._notify(fired)
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"alerts": len(self._alerts), "products": len(self._targets), "notifying": len(self._firing), "fired": self.fired}
+
+async def notify_triggered_alerts(fired: List[Tuple[Dict, float, Optional[str]]]):
+    """Mark triggered alerts and queue their emails in the notification outbox.
+
+    The rows for a chunk of alerts are written together with the alerts'
+    ``triggered`` flag, in one transaction when MONGO_TRANSACTIONS is set.
+    Without a replica set the outbox is written first: if the process
+    stops between the two writes the alert is still untriggered, the next
+    consistency pass fires it again, and its outbox row (keyed by alert
+    id) is already there. Alerts that were deleted or already triggered
+    since this worker indexed them (by another worker) are dropped, so
+    no notification goes out for them. Delivery happens in the outbox
+    workers.
+    """
+    now = time.time()
+    triggered_at = datetime.now(timezone.utc).isoformat()
+    for start in range(0, len(fired), ALERT_WRITE_BATCH):
+        chunk = fired[start:start + ALERT_WRITE_BATCH]
+        try:
+            live = {
+                doc["id"] async for doc in db.price_alerts.find(
+                    {"id": {"$in": [alert["id"] for alert, _, _ in chunk]}, "triggered": False}, {"_id": 0, "id": 1}
+                )
+            }
+        except Exception as e:
+            logger.error(f"Error checking triggered price alerts: {e}")
+            continue
+        chunk = [(alert, best_price, store) for alert, best_price, store in chunk if alert["id"] in live]
+        if not chunk:
+            continue
+        rows = [
+            outbox.row(f"price-alert:{alert['id']}", "email", {
+                "email": alert["email"],
+                "product_name": alert["product_name"],
+                "target_price": alert["target_price"],
+                "current_price": best_price,
+                "store_name": STORES.get(store, {}).get("name", store),
+            }, now)
+            for alert, best_price, store in chunk if alert.get("email") and email_dispatcher.enabled
+        ]
+        alert_ops = [
+            UpdateOne({"id": alert["id"], "triggered": False}, {"$set": {"triggered": True, "triggered_at": triggered_at}})
+            for alert, _, _ in chunk
+        ]
+        try:
+            if MONGO_TRANSACTIONS:
+                async with await client.start_session() as session:
+                    async with session.start_transaction():
+                        await outbox.add(rows, session=session)
+                        await db.price_alerts.bulk_write(alert_ops, ordered=False, session=session)
+            else:
+                await outbox.add(rows)
+                await db.price_alerts.bulk_write(alert_ops, ordered=False)
+        except BulkWriteError as e:
+            logger.error(f"Some triggered alerts were not recorded: {e.details.get('writeErrors')}")
+        except Exception as e:
+            logger.error(f"Error recording triggered price alerts: {e}")
+    outbox.wake("email")
+
+alert_engine = AlertEngine(catalog, notify_triggered_alerts)
+
+class AlertScheduler:
+    """Runs a background job at most once at a time and at most once per ``min_interval``.
+
+    ``trigger()`` asks for a run. Triggers that arrive while a run is
+    pending or in progress coalesce into one follow-up run, so a burst of
+    requests costs a single pass. Without triggers the job still runs every
+    ``interval`` seconds. With a ``leases`` collection only the worker
+    holding the ``name`` lease runs the periodic job; the holder renews the
+    lease on each run, and another worker takes over once it lapses (two
+    intervals after the holder's last run). The other workers run
+    ``follower_job`` on the interval instead, if given. The first run after
+    startup and runs asked for with ``trigger()`` always run ``job`` in
+    this worker.
+    """
+
+    def __init__(self, name: str, job: Callable[[], Awaitable[Any]], interval: float, min_interval: float,
+                 leases=None, follower_job: Optional[Callable[[], Awaitable[Any]]] = None):
+        self.name = name
+        self.job = job
+        self.follower_job = follower_job
+        self.interval = interval
+        self.min_interval = min_interval
+        self.leases = leases
+        self.owner = uuid.uuid4().hex
+        self.state = "stopped"
+        self.leader = leases is None
+        self.runs = 0
+        self.follower_runs = 0  # periodic runs of follower_job while another worker holds the lease
+        self.triggers = 0
+        self.coalesced = 0
+        self.last_run_at: Optional[str] = None
+        self.last_duration: Optional[float] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+        self._requested = asyncio.Event()
+        self._last_started = float('-inf')
+        self._next_run = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def trigger(self):
+        self.triggers += 1
+        if self._requested.is_set() or self.state == "running":
+            self.coalesced += 1
+        self._requested.set()
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.state = "stopped"
+
+    async def _acquire(self) -> bool:
+        """Take or renew the lease. Without a leases collection every worker is the leader."""
+        if self.leases is None:
+            return True
+        now = time.time()
+        try:
+            await self.leases.find_one_and_update(
+                {"_id": self.name, "$or": [{"owner": self.owner}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"owner": self.owner, "expires_at": now + 2 * self.interval}},
+                upsert=True,
+            )
+            self.leader = True
+        except DuplicateKeyError:
+            # Someone else holds an unexpired lease
+            self.leader = False
+        except Exception as e:
+            logger.error(f"Could not acquire {self.name} lease: {e}")
+            self.leader = False
+        return self.leader
+
+    async def run_once(self, job: Optional[Callable[[], Awaitable[Any]]] = None):
+        self.state = "running"
+        self._last_started = time.monotonic()
+        self.last_run_at = datetime.now(timezone.utc).isoformat()
+        try:
+            self.last_result = await (job or self.job)()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"{self.name} run failed: {e}")
+        finally:
+            self.last_duration = round(time.monotonic() - self._last_started, 3)
+            self.runs += 1
+
+    async def _loop(self):
+        first = True
+        while True:
+            if not first:
+                self.state = "idle"
+                self._next_run = time.monotonic() + self.interval
+                try:
+                    await asyncio.wait_for(self._requested.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            wait = self._last_started + self.min_interval - time.monotonic()
+            if wait > 0:
+                self.state = "debouncing"
+                self._next_run = time.monotonic() + wait
+                await asyncio.sleep(wait)
+            requested = self._requested.is_set()
+            self._requested.clear()
+            leader = await self._acquire()
+            if leader or first or requested:
+                await self.run_once()
+            elif self.follower_job is not None:
+                self.follower_runs += 1
+                await self.run_once(self.follower_job)
+            first = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "leader": self.leader,
+            "interval": self.interval,
+            "min_interval": self.min_interval,
+            "runs": self.runs,
+            "follower_runs": self.follower_runs,
+            "triggers": self.triggers,
+            "coalesced": self.coalesced,
+            "pending": self._requested.is_set(),
+            "next_run_in": round(max(0.0, self._next_run - time.monotonic()), 1) if self.state in ("idle", "debouncing") else None,
+            "last_run_at": self.last_run_at,
+            "last_duration": self.last_duration,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+alert_scheduler = AlertScheduler(
+    "price-alert-consistency", check_price_alerts_and_notify, ALERT_CONSISTENCY_INTERVAL, ALERT_CHECK_MIN_INTERVAL,
+    leases=db.scheduler_leases if ALERT_LEADER_ELECTION else None, follower_job=refresh_price_alerts,
+)
+
+# ============================================
+# NOTIFICATION OUTBOX
+# ============================================
+
+class NotificationOutbox:
+    """Durable notification queue in the notification_outbox collection.
+
+    Each row is one notification on one channel, keyed by ``_id`` so that
+    writing the same row twice is a no-op. Every registered channel gets
+    its own pool of workers, so email and push scale independently. A
+    worker claims due rows by leasing them (status ``sending``, next
+    attempt pushed out by ``lease``), so a row whose worker died becomes
+    due again once the lease runs out.
+
+    Before its first attempt, a claim's rows are split by the channel's
+    ``plan`` into sends (one provider call each), and each send's id is
+    stored on its rows as ``send_key`` before anything goes out. A retry
+    re-claims and re-sends exactly those rows with the same key, which the
+    handler passes to the provider as its idempotency key, so a send whose
+    response was lost is not delivered twice. A failed send goes back to
+    pending with an exponential, jittered backoff, and is marked ``failed``
+    after ``max_attempts``.
+    """
+
+    def __init__(self, collection, claim_batch: int = OUTBOX_CLAIM_BATCH, max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+                 base_backoff: float = OUTBOX_BACKOFF, max_backoff: float = OUTBOX_MAX_BACKOFF,
+                 lease: float = OUTBOX_LEASE, poll_interval: float = OUTBOX_POLL_INTERVAL):
+        self.collection = collection
+        self.claim_batch = claim_batch
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.channels: Dict[str, Tuple[Callable[[List[Dict], str], Awaitable[bool]], Callable[[List[Dict]], List[List[Dict]]], int]] = {}
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._workers: List[asyncio.Task] = []
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def register(self, channel: str, deliver: Callable[[List[Dict], str], Awaitable[bool]],
+                 plan: Callable[[List[Dict]], List[List[Dict]]], workers: int):
+        """``plan`` splits fresh rows into sends; ``deliver`` makes one send with its key and returns success"""
+        self.channels[channel] = (deliver, plan, workers)
+        self._wake[channel] = asyncio.Event()
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("channel", 1), ("status", 1), ("next_attempt_at", 1)])
+        await self.collection.create_index("send_key", sparse=True)
+        await self.collection.create_index("claim", sparse=True)
+
+    @staticmethod
+    def row(key: str, channel: str, payload: Dict, now: float) -> Dict:
+        return {
+            "_id": key,
+            "channel": channel,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+        }
+
+    async def add(self, rows: List[Dict], session=None):
+        """Insert rows whose key is not already in the outbox"""
+        if not rows:
+            return
+        ops = [
+            UpdateOne({"_id": row["_id"]}, {"$setOnInsert": {k: v for k, v in row.items() if k != "_id"}}, upsert=True)
+            for row in rows
+        ]
+        await self.collection.bulk_write(ops, ordered=False, session=session)
+
+    def wake(self, channel: Optional[str] = None):
+        """Start idle workers on ``channel`` (all channels if None) without waiting for the poll"""
+        for name, event in self._wake.items():
+            if channel in (None, name):
+                event.set()
+
+    def start(self):
+        for channel, (_, _, workers) in self.channels.items():
+            for _ in range(workers):
+                self._workers.append(asyncio.create_task(self._worker(channel)))
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def claim(self, channel: str, limit: int) -> Tuple[str, List[Dict]]:
+        """Lease about ``limit`` due rows, oldest first, always taking a planned send whole.
+
+        Rows are picked and leased in bulk (one find, one update_many), then
+        read back by claim token. Returns the claim token and rows.
+        """
+        token = uuid.uuid4().hex
+        now = time.time()
+        lease = {"$set": {"status": "sending", "claim": token, "next_attempt_at": now + self.lease}, "$inc": {"attempts": 1}}
+        due = {"status": {"$in": ["pending", "sending"]}, "next_attempt_at": {"$lte": now}}
+        picked = await self.collection.find(
+            {"channel": channel, **due}, {"_id": 1, "send_key": 1},
+        ).sort("next_attempt_at", 1).limit(limit).to_list(None)
+        if not picked:
+            return token, []
+        ids = [row["_id"] for row in picked]
+        # The rest of a planned send was due together with the rows picked from it
+        send_keys = list({row["send_key"] for row in picked if row.get("send_key")})
+        selector = {"$or": [{"_id": {"$in": ids}}, {"send_key": {"$in": send_keys}}]} if send_keys else {"_id": {"$in": ids}}
+        await self.collection.update_many({**selector, **due}, lease)
+        rows = await self.collection.find({"claim": token}).to_list(None)
+        if send_keys:
+            # A worker claiming at the same moment may have leased part of a send;
+            # hand our part back so the whole send is retried together
+            split = {
+                row["send_key"] async for row in self.collection.find(
+                    {"send_key": {"$in": send_keys}, "claim": {"$ne": token}, "status": {"$in": ["pending", "sending"]}},
+                    {"_id": 0, "send_key": 1},
+                )
+            }
+            if split:
+                await self.collection.update_many(
+                    {"claim": token, "send_key": {"$in": list(split)}},
+                    {"$set": {"next_attempt_at": now}, "$unset": {"claim": ""}, "$inc": {"attempts": -1}},
+                )
+                rows = [row for row in rows if row.get("send_key") not in split]
+        return token, rows
+
+    async def run_once(self, channel: str) -> int:
+        """Claim, deliver and settle one batch. Returns the number of rows handled."""
+        token, rows = await self.claim(channel, self.claim_batch)
+        if not rows:
+            return 0
+        deliver, plan, _ = self.channels[channel]
+        sends: Dict[str, List[Dict]] = {}
+        fresh = []
+        for row in rows:
+            if row.get("send_key"):
+                sends.setdefault(row["send_key"], []).append(row)
+            else:
+                fresh.append(row)
+        if fresh:
+            planned = {uuid.uuid4().hex: group for group in plan(sorted(fresh, key=lambda row: row["_id"]))}
+            # Recorded before sending: a retry must repeat exactly this send under this key
+            await self.collection.bulk_write([
+                UpdateOne({"_id": row["_id"], "claim": token}, {"$set": {"send_key": key}})
+                for key, group in planned.items() for row in group
+            ], ordered=False)
+            sends.update(planned)
+
+        async def attempt(key: str, group: List[Dict]) -> Tuple[bool, str]:
+            try:
+                return await deliver(sorted(group, key=lambda row: row["_id"]), key), "delivery failed"
+            except Exception as e:
+                return False, str(e)
+
+        outcomes = await asyncio.gather(*(attempt(key, group) for key, group in sends.items()))
+        now = time.time()
+        # One jitter factor per batch keeps each send's rows due together
+        jitter = random.uniform(0.5, 1.0)
+        ops = []
+        for group, (delivered, error) in zip(sends.values(), outcomes):
+            for row in group:
+                claimed = {"_id": row["_id"], "claim": token}
+                if delivered:
+                    self.sent += 1
+                    update = {"status": "sent", "sent_at": datetime.fromtimestamp(now, timezone.utc).isoformat()}
+                elif row["attempts"] >= self.max_attempts:
+                    self.failed += 1
+                    update = {"status": "failed", "last_error": error}
+                else:
+                    self.retried += 1
+                    backoff = min(self.base_backoff * 2 ** (row["attempts"] - 1), self.max_backoff)
+                    update = {"status": "pending", "next_attempt_at": now + backoff * jitter, "last_error": error}
+                ops.append(UpdateOne(claimed, {"$set": update, "$unset": {"claim": ""}}))
+        # If this write is lost the rows stay leased and are retried after the
+        # lease, as the same sends with the same keys
+        await self.collection.bulk_write(ops, ordered=False)
+        return len(rows)
+
+    async def _worker(self, channel: str):
+        wake = self._wake[channel]
+        while True:
+            wake.clear()
+            try:
+                if await self.run_once(channel):
+                    continue
+            except Exception as e:
+                logger.error(f"Outbox worker for {channel} failed: {e}")
+            try:
+                await asyncio.wait_for(wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def retry_failed(self, channel: Optional[str] = None) -> int:
+        """Put failed rows back in the queue with a fresh set of attempts"""
+        query: Dict[str, Any] = {"status": "failed"}
+        if channel:
+            query["channel"] = channel
+        result = await self.collection.update_many(query, {"$set": {"status": "pending", "attempts": 0, "next_attempt_at": time.time()}})
+        return result.modified_count
+
+    async def counts(self) -> Dict[str, Dict[str, int]]:
+        """Row counts by channel and status"""
+        counts: Dict[str, Dict[str, int]] = {}
+        async for group in self.collection.aggregate([{"$group": {"_id": {"channel": "$channel", "status": "$status"}, "n": {"$sum": 1}}}]):
+            counts.setdefault(group["_id"]["channel"], {})[group["_id"]["status"]] = group["n"]
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": {channel: workers for channel, (_, _, workers) in self.channels.items()},
+            "running": sum(not task.done() for task in self._workers),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+def _alert_notifications(rows: List[Dict]) -> List[Dict]:
+    return [dict(row["payload"], alert_id=row["_id"]) for row in rows]
+
+def plan_alert_emails(rows: List[Dict]) -> List[List[Dict]]:
+    """Outbox plan for the email channel: one Resend call per group of whole recipients"""
+    by_id = {row["_id"]: row for row in rows}
+    return [
+        [by_id[item["alert_id"]] for _, items in group for item in items]
+        for group in email_dispatcher.plan(_alert_notifications(rows))
+    ]
+
+async def deliver_alert_emails(rows: List[Dict], send_key: str) -> bool:
+    """Outbox handler for the email channel: one email per recipient, in one API call"""
+    results = await email_dispatcher.dispatch(_alert_notifications(rows), idempotency_key=f"price-alerts/{send_key}")
+    return all(results.values())
+
+outbox = NotificationOutbox(db.notification_outbox)
+if email_dispatcher.enabled:
+    outbox.register("email", deliver_alert_emails, plan_alert_emails, OUTBOX_EMAIL_WORKERS)
 
 # ============================================
 # PYDANTIC MODELS
@@ -599,18 +2804,59 @@ class Product(BaseModel):
     created_at: str
     source: Optional[str] = "mock"
 
+class ProductSummary(BaseModel):
+    """A product as it appears in list responses.
+
+    Carries everything except ``price_history``, which loads only through
+    /api/products/{id}/history. With ``fields=`` only ``id`` and the
+    requested fields are set, and unset fields are left out of the response.
+    """
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    name: Optional[str] = None
+    category: Optional[str] = None
+    brand: Optional[str] = None
+    size: Optional[str] = None
+    unit: Optional[str] = None
+    image: Optional[str] = None
+    store_prices: Optional[Dict[str, Any]] = None
+    created_at: Optional[str] = None
+    source: Optional[str] = None
+
+SUMMARY_FIELDS = tuple(ProductSummary.model_fields)
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validate a comma-separated fields= value; all summary fields when empty"""
+    if not fields:
+        return SUMMARY_FIELDS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(SUMMARY_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(SUMMARY_FIELDS)}")
+    return tuple(field for field in SUMMARY_FIELDS if field == "id" or field in requested)
+
+def project(products: List[Dict], fields: Tuple[str, ...] = SUMMARY_FIELDS) -> List[Dict]:
+    return [{field: p[field] for field in fields if field in p} for p in products]
+
 class ProductResponse(BaseModel):
-    products: List[Product]
+    products: List[ProductSummary]
     total: int
     page: int
     page_size: int
     source: str = "mock"
+    next_cursor: Optional[str] = None
+
+class PriceHistoryResponse(BaseModel):
+    product_id: str
+    product_name: str
+    history: List[Dict]
 
 class SearchSuggestion(BaseModel):
     id: str
     name: str
     category: str
     brand: str
+    kind: str = "product"
 
 class StoreInfo(BaseModel):
     key: str
@@ -682,7 +2928,7 @@ async def root():
         "version": "4.0.0", 
         "features": [
             "Price comparison across 5 stores",
-            "Web scraping for Coles/Woolworths",
+            "Web scraping for all 5 stores",
             "Email notifications via Resend",
             "Shopping lists with store totals",
             "Price history charts (30 days)",
@@ -710,6 +2956,66 @@ async def get_stores():
 async def get_categories():
     return {"categories": CATEGORIES}
 
+def _search_fingerprint(*filters) -> str:
+    return hashlib.blake2b(orjson.dumps(filters), digest_size=6).hexdigest()
+
+def encode_cursor(fingerprint: str, key: Any, product_id: str) -> str:
+    """Opaque keyset cursor: the last row's (sort key, id), tied to the filters that produced it"""
+    if isinstance(key, (float, np.floating)):
+        key = float(key) if np.isfinite(key) else "inf"  # unavailable products sort last at inf
+    elif isinstance(key, np.generic):
+        key = key.item()
+    return base64.urlsafe_b64encode(orjson.dumps([fingerprint, key, product_id])).rstrip(b"=").decode()
+
+def _valid_cursor_key(key: Any, sort_by: str) -> bool:
+    if sort_by == "best_price":
+        return key == "inf" or (isinstance(key, (int, float)) and not isinstance(key, bool))
+    if sort_by == "name":
+        return isinstance(key, str)
+    return isinstance(key, int) and not isinstance(key, bool)
+
+def decode_cursor(cursor: str, fingerprint: str, sort_by: str) -> Tuple[Any, int]:
+    """(sort key, ordinal) to resume after; 400 if the cursor is malformed or from another search"""
+    try:
+        payload = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not (isinstance(payload, list) and len(payload) == 3 and isinstance(payload[0], str) and isinstance(payload[2], str)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    found, key, product_id = payload
+    ordinal = catalog.ordinal(product_id)
+    if found != fingerprint or ordinal is None or not _valid_cursor_key(key, sort_by):
+        raise HTTPException(status_code=400, detail="Cursor does not match this search")
+    if sort_by == "best_price":
+        key = np.float32(key)
+    return key, ordinal
+
+# Text-search results in page order, so cursor pages resume without re-running the search
+search_results = TTLCache("search_results", SEARCH_RESULT_CACHE_MAX_ENTRIES, default_ttl=SEARCH_RESULT_CACHE_TTL)
+
+def _ordered_matches(fingerprint: str, q: str, fuzzy: bool, select: Callable[[], np.ndarray], sort_by: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(matching ordinals in page order, their sort keys), cached per search and catalog version"""
+    entry = search_results.get(fingerprint)
+    if entry is None or entry[0] != catalog.version:
+        ordinals = np.asarray(catalog.search_ordinals(q, fuzzy), dtype=np.intp)
+        ordinals = catalog.order_by(ordinals[select()[ordinals]], sort_by)
+        entry = (catalog.version, ordinals, catalog.sort_keys(sort_by)[ordinals])
+        search_results.set(fingerprint, entry)
+    return entry[1], entry[2]
+
+def _take(order: np.ndarray, mask: np.ndarray, start: int, stop: int, count: int) -> np.ndarray:
+    """The first count ordinals of order[start:stop] that pass mask, scanning in growing chunks"""
+    found, chunk = [], max(count * 4, 256)
+    while start < stop and sum(len(block) for block in found) < count:
+        block = order[start:min(start + chunk, stop)]
+        found.append(block[mask[block]])
+        start += chunk
+        chunk *= 2
+    return np.concatenate(found)[:count] if found else order[:0]
+
+# Hot read endpoints return ORJSONResponse directly: their dicts are trusted catalog
+# data, so FastAPI skips re-validating them against response_model, which
+# still documents the schema in OpenAPI.
 @api_router.get("/products/search", response_model=ProductResponse)
 async def search_products(
     q: str = Query("", description="Search query"),
@@ -717,98 +3023,167 @@ async def search_products(
     store: Optional[str] = Query(None),
     min_price: Optional[float] = Query(None),
     max_price: Optional[float] = Query(None),
-    sort_by: str = Query("best_price"),
+    sort_by: str = Query("best_price", description="best_price, name or relevance"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    fuzzy: bool = Query(False, description="Typo-tolerant matching ranked by similarity"),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all but price_history)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; takes precedence over page"),
 ):
     source = "mock"
-    filtered = MOCK_PRODUCTS.copy()
+    selected = parse_fields(fields)
+    store = store if store in STORES else None
+    sort_by = sort_by if sort_by in ("best_price", "name") else "relevance"
+    select = lambda: catalog.select(category=category, store=store, min_price=min_price, max_price=max_price)
+    fingerprint = _search_fingerprint(q, category, store, min_price, max_price, sort_by, fuzzy)
+    after = decode_cursor(cursor, fingerprint, sort_by) if cursor else None
     
     if q:
-        q_lower = q.lower()
-        filtered = [p for p in filtered if q_lower in p["name"].lower() or q_lower in p.get("brand", "").lower()]
-    
-    if category:
-        filtered = [p for p in filtered if p.get("category") == category]
-    
-    if store and store in STORES:
-        filtered = [p for p in filtered if p.get("store_prices", {}).get(store, {}).get("available", False)]
-    
-    if min_price is not None or max_price is not None:
-        def get_best_price(p):
-            prices = [sp["price"] for sp in p.get("store_prices", {}).values() if sp.get("available") and sp.get("price", 0) > 0]
-            return min(prices) if prices else float('inf')
-        
-        if min_price is not None:
-            filtered = [p for p in filtered if get_best_price(p) >= min_price]
-        if max_price is not None:
-            filtered = [p for p in filtered if get_best_price(p) <= max_price]
-    
-    if sort_by == "best_price":
-        def get_best_price(p):
-            prices = [sp["price"] for sp in p.get("store_prices", {}).values() if sp.get("available") and sp.get("price", 0) > 0]
-            return min(prices) if prices else float('inf')
-        filtered.sort(key=get_best_price)
-    elif sort_by == "name":
-        filtered.sort(key=lambda p: p.get("name", "").lower())
+        ordinals, keys = _ordered_matches(fingerprint, q, fuzzy, select, sort_by)
+        total = len(ordinals)
+        if after is None:
+            start = (page - 1) * page_size
+        elif fuzzy:
+            # Similarity order has no key to compare; resume just after the last row
+            hits = np.flatnonzero(ordinals == after[1])
+            if not len(hits):
+                raise HTTPException(status_code=400, detail="Cursor does not match this search")
+            start = int(hits[0]) + 1
+        else:
+            # Matches are in (key, ordinal) order: bisect to the key, then to the ordinal among ties
+            lo = int(np.searchsorted(keys, after[0], "left"))
+            hi = int(np.searchsorted(keys, after[0], "right"))
+            start = lo + int(np.searchsorted(ordinals[lo:hi], after[1], "right"))
+        window = ordinals[start:start + page_size]
+        has_more = start + page_size < total
+    else:
+        mask = select()
+        total = int(np.count_nonzero(mask))
+        order, keys = catalog.sorted_view(sort_by)
+        lo, hi = 0, len(order)
+        if sort_by == "best_price":
+            # The price range is two binary searches over the price-sorted view
+            if min_price is not None:
+                lo = int(np.searchsorted(keys, np.float32(min_price), "left"))
+            if max_price is not None:
+                hi = int(np.searchsorted(keys, np.float32(max_price), "right"))
+        if after is None:
+            ordinals = order[lo:hi]
+            ordinals = ordinals[mask[ordinals]]
+            start = (page - 1) * page_size
+            window = ordinals[start:start + page_size]
+            has_more = start + page_size < total
+        else:
+            # Resume from the cursor's position in the sorted view; only scan forward as far as one page needs
+            window = _take(order, mask, max(lo, catalog.seek(sort_by, *after)), hi, page_size + 1)
+            has_more = len(window) > page_size
+            window = window[:page_size]
     
-    total = len(filtered)
-    start = (page - 1) * page_size
-    paginated = filtered[start:start + page_size]
+    next_cursor = None
+    if has_more and len(window):
+        last = int(window[-1])
+        next_cursor = encode_cursor(fingerprint, catalog.sort_keys(sort_by)[last], catalog.products[last]["id"])
+    paginated = project(catalog.page(window), selected)
     
-    return ProductResponse(products=paginated, total=total, page=page, page_size=page_size, source=source)
+    return ORJSONResponse({
+        "products": paginated, "total": total, "page": page, "page_size": page_size,
+        "source": source, "next_cursor": next_cursor,
+    })
 
 @api_router.get("/products/suggestions")
-async def get_suggestions(q: str = Query(..., min_length=1)):
+async def get_suggestions(
+    q: str = Query(..., min_length=1),
+    fuzzy: bool = Query(False),
+    rank: str = Query("popularity", description="popularity or price"),
+):
     q_lower = q.lower()
     suggestions = []
     seen = set()
     
-    for p in MOCK_PRODUCTS:
-        if q_lower in p["name"].lower() and p["name"] not in seen:
-            suggestions.append(SearchSuggestion(id=p["id"], name=p["name"], category=p["category"], brand=p["brand"]))
-            seen.add(p["name"])
-            if len(suggestions) >= 8:
+    def add(kind: str, name: str, p: Dict) -> bool:
+        if (kind, name) not in seen:
+            if kind == "product":
+                suggestion = SearchSuggestion(id=p["id"], name=name, category=p["category"], brand=p["brand"])
+            else:
+                # Brands and categories are not products; give them their own ids
+                suggestion = SearchSuggestion(
+                    id=f"{kind}:{name}", name=name, kind=kind,
+                    category=name if kind == "category" else "", brand=name if kind == "brand" else "",
+                )
+            suggestions.append(suggestion)
+            seen.add((kind, name))
+        return len(suggestions) >= 8
+    
+    if fuzzy:
+        for p in catalog.search_text(q, fuzzy=True):
+            if add("product", p["name"], p):
+                break
+        return {"suggestions": suggestions}
+    
+    # Word-prefix completions first, then mid-word substring matches to fill up
+    for kind, label, ordinal in catalog.autocomplete.complete(q, 8, rank):
+        add(kind, label, catalog.products[ordinal])
+    if len(suggestions) < 8:
+        for ordinal in catalog.substring_index.search(q):
+            p = catalog.products[ordinal]
+            if q_lower in p["name"].lower() and add("product", p["name"], p):
                 break
     
     return {"suggestions": suggestions}
 
-@api_router.get("/products/{product_id}")
+@api_router.get("/products/{product_id}", response_model=Product)
 async def get_product(product_id: str):
-    for p in MOCK_PRODUCTS:
-        if p["id"] == product_id:
-            return p
-    raise HTTPException(status_code=404, detail="Product not found")
+    p = catalog.get(product_id)
+    if p is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    catalog.record_view(product_id)
+    return ORJSONResponse(p)
 
-@api_router.get("/products/{product_id}/history")
+@api_router.get("/products/{product_id}/history", response_model=PriceHistoryResponse)
 async def get_product_history(product_id: str):
     """Get price history for a product"""
-    for p in MOCK_PRODUCTS:
-        if p["id"] == product_id:
-            return {
-                "product_id": product_id,
-                "product_name": p["name"],
-                "history": p.get("price_history", [])
-            }
-    raise HTTPException(status_code=404, detail="Product not found")
+    p = catalog.get(product_id)
+    if p is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return ORJSONResponse({
+        "product_id": product_id,
+        "product_name": p["name"],
+        "history": p.get("price_history", [])
+    })
 
 @api_router.get("/products/category/{category}")
-async def get_products_by_category(category: str, limit: int = Query(10, ge=1, le=50)):
-    products = [p for p in MOCK_PRODUCTS if p["category"] == category][:limit]
-    return {"products": products, "category": category}
+async def get_products_by_category(
+    request: Request,
+    category: str,
+    limit: int = Query(10, ge=1, le=50),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all but price_history)"),
+):
+    selected = parse_fields(fields)
+    def build():
+        products = catalog.page(catalog.facets["category"].get(category), limit=limit)
+        return {"products": project(products, selected), "category": category}
+    return list_responses.respond(request, f"category:{category}:{limit}:{','.join(selected)}", catalog.version, build)
 
 @api_router.get("/specials")
-async def get_specials(limit: int = Query(12, ge=1, le=50)):
-    specials = [p for p in MOCK_PRODUCTS if any(sp.get("on_special") for sp in p["store_prices"].values())][:limit]
-    return {"products": specials}
+async def get_specials(
+    request: Request,
+    limit: int = Query(12, ge=1, le=50),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return (default: all but price_history)"),
+):
+    selected = parse_fields(fields)
+    def build():
+        specials = catalog.page(np.flatnonzero(catalog.select(on_special=True)), limit=limit)
+        return {"products": project(specials, selected)}
+    return list_responses.respond(request, f"specials:{limit}:{','.join(selected)}", catalog.version, build)
 
 # Price Alerts
 @api_router.post("/alerts", response_model=PriceAlert)
-async def create_price_alert(alert: PriceAlertCreate, background_tasks: BackgroundTasks):
+async def create_price_alert(alert: PriceAlertCreate):
     alert_obj = PriceAlert(**alert.model_dump())
     doc = alert_obj.model_dump()
     await db.price_alerts.insert_one(doc)
-    background_tasks.add_task(check_price_alerts_and_notify)
+    # Only this alert needs checking; it fires now if the price is already at target
+    alert_engine.add(alert_obj.model_dump())
     return alert_obj
 
 @api_router.get("/alerts", response_model=List[PriceAlert])
@@ -820,6 +3195,7 @@ async def get_price_alerts(product_id: Optional[str] = None):
 @api_router.delete("/alerts/{alert_id}")
 async def delete_price_alert(alert_id: str):
     result = await db.price_alerts.delete_one({"id": alert_id})
+    alert_engine.remove(alert_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Alert not found")
     return {"message": "Alert deleted", "id": alert_id}
@@ -942,15 +3318,74 @@ async def unsubscribe_push(endpoint: str):
     await db.push_subscriptions.delete_one({"endpoint": endpoint})
     return {"message": "Unsubscribed"}
 
+# Cache statistics
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    stats = {name: cache.stats() for name, cache in CACHES.items()}
+    stats["scrape_cache"] = shared_scrape_cache.stats()
+    stats["list_responses"]["rebuilds"] = list_responses.rebuilds
+    return stats
+
+# Scraper health
+@api_router.get("/scraper/stats")
+async def get_scraper_stats():
+    return {"rate_limits": {store: limiter.stats() for store, limiter in scrape_limiters.items()}}
+
+# Admin: scraper circuit breakers
+@api_router.get("/admin/breakers")
+async def get_breakers():
+    return {store: breaker.stats() for store, breaker in scrape_breakers.items()}
+
+@api_router.post("/admin/breakers/{store}/reset")
+async def reset_breaker(store: str):
+    if store not in scrape_breakers:
+        raise HTTPException(status_code=404, detail="Store not found")
+    scrape_breakers[store].reset()
+    return {"message": "Breaker reset", "store": store}
+
+# Admin: price alert checks
+@api_router.get("/admin/alerts/scheduler")
+async def get_alert_scheduler():
+    return {
+        "scheduler": alert_scheduler.stats(),
+        "engine": alert_engine.stats(),
+        "email": email_dispatcher.stats(),
+        "outbox": outbox.stats(),
+    }
+
+@api_router.post("/admin/alerts/check")
+async def request_alert_check():
+    """Ask for a full consistency pass; requests coalesce into one run per ALERT_CHECK_MIN_INTERVAL"""
+    alert_scheduler.trigger()
+    return {"message": "Alert check requested", "scheduler": alert_scheduler.stats()}
+
+# Admin: notification outbox
+@api_router.get("/admin/outbox")
+async def get_outbox_stats():
+    return {"workers": outbox.stats(), "rows": await outbox.counts()}
+
+@api_router.post("/admin/outbox/retry")
+async def retry_failed_notifications(channel: Optional[str] = None):
+    retried = await outbox.retry_failed(channel)
+    outbox.wake(channel)
+    return {"message": "Failed notifications requeued", "count": retried}
+
 # Scraping endpoint
 @api_router.get("/scrape/{query}")
 async def scrape_prices(query: str):
-    results = await scrape_all_stores(query)
+    scrape = await scrape_all_stores(query)
+    results = scrape["data"]
     return {
         "query": query,
         "results": results,
         "total_coles": len(results.get("coles", [])),
-        "total_woolworths": len(results.get("woolworths", []))
+        "total_woolworths": len(results.get("woolworths", [])),
+        "totals": {store: len(products) for store, products in results.items()},
+        "scraped_at": datetime.fromtimestamp(scrape["scraped_at"], timezone.utc).isoformat(),
+        "age_seconds": round(time.time() - scrape["scraped_at"], 1),
+        "stale": scrape["stale"],
+        "unavailable": scrape.get("unavailable", {}),
+        "breakers": {store: breaker.state for store, breaker in scrape_breakers.items()}
     }
 
 # Include router
@@ -964,6 +3399,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup_scraper_clients():
+    scraper_clients.start([adapter.base_url for adapter in STORE_ADAPTERS.values()])
+    try:
+        await shared_scrape_cache.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Could not create scrape_cache indexes: {e}")
+
+@app.on_event("startup")
+async def start_alert_consistency_checks():
+    try:
+        await db.price_alerts.create_index("id")
+        await db.price_alerts.create_index("triggered")
+    except Exception as e:
+        logger.error(f"Could not create price_alerts indexes: {e}")
+    alert_scheduler.start()
+
+@app.on_event("startup")
+async def start_outbox_workers():
+    try:
+        await outbox.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Could not create notification_outbox indexes: {e}")
+    outbox.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await alert_scheduler.stop()
+    await alert_engine.drain()
+    await outbox.stop()
     client.close()
+    await scraper_clients.close()
+    parse_pool.shutdown()
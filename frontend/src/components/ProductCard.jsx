@@ -10,6 +10,7 @@ import {
   STORE_INFO,
 } from "@/lib/utils";
 import { favorites } from "@/lib/favorites";
+import { api } from "@/lib/api";
 import { toast } from "sonner";
 import { PriceHistoryChart } from "@/components/PriceHistoryChart";
 
@@ -17,6 +18,7 @@ export const ProductCard = ({ product, onFavoriteChange }) => {
   const [isFavorite, setIsFavorite] = useState(false);
   const [showAllPrices, setShowAllPrices] = useState(false);
   const [showPriceHistory, setShowPriceHistory] = useState(false);
+  const [priceHistory, setPriceHistory] = useState(product.price_history || null);
 
   const bestPrice = getBestPrice(product.store_prices);
   const worstPrice = getWorstPrice(product.store_prices);
@@ -35,6 +37,19 @@ export const ProductCard = ({ product, onFavoriteChange }) => {
     toast.success(result.added ? "Added to favorites" : "Removed from favorites");
   };
 
+  // List responses don't include price history; fetch it the first time it's opened
+  const handleShowPriceHistory = async () => {
+    if (!priceHistory) {
+      try {
+        setPriceHistory(await api.getProductHistory(product.id));
+      } catch (error) {
+        toast.error("Couldn't load price history");
+        return;
+      }
+    }
+    setShowPriceHistory(true);
+  };
+
   // Sort prices by amount (lowest first)
   const sortedPrices = Object.entries(product.store_prices)
     .filter(([_, data]) => data.available)
@@ -147,9 +162,9 @@ export const ProductCard = ({ product, onFavoriteChange }) => {
         )}
 
         {/* Price History Button */}
-        {product.price_history && product.price_history.length > 0 && (
+        {(!priceHistory || priceHistory.length > 0) && (
           <button
-            onClick={() => setShowPriceHistory(true)}
+            onClick={handleShowPriceHistory}
             className="w-full mt-3 flex items-center justify-center gap-2 text-sm font-medium text-gray-600 dark:text-gray-300 hover:text-black dark:hover:text-white bg-gray-100 dark:bg-gray-700 hover:bg-gray-200 dark:hover:bg-gray-600 rounded-lg py-2 transition-colors"
             data-testid={`price-history-btn-${product.id}`}
           >
@@ -172,7 +187,7 @@ export const ProductCard = ({ product, onFavoriteChange }) => {
 
       {/* Price History Modal */}
       <PriceHistoryChart
-        product={product}
+        product={{ ...product, price_history: priceHistory }}
         isOpen={showPriceHistory}
         onClose={() => setShowPriceHistory(false)}
       />
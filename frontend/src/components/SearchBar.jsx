@@ -69,8 +69,14 @@ export const SearchBar = ({ initialQuery = "", onSearch, large = false }) => {
   };
 
   const handleSuggestionClick = (suggestion) => {
-    setQuery(suggestion.name);
     setShowSuggestions(false);
+    if (suggestion.kind === "category") {
+      // Text search does not match categories; open the category filter instead
+      setQuery("");
+      navigate(`/search?category=${encodeURIComponent(suggestion.name)}`);
+      return;
+    }
+    setQuery(suggestion.name);
     if (onSearch) {
       onSearch(suggestion.name);
     } else {
@@ -178,7 +184,11 @@ export const SearchBar = ({ initialQuery = "", onSearch, large = false }) => {
               <div className="flex-1 min-w-0">
                 <p className="font-medium text-black dark:text-white truncate">{suggestion.name}</p>
                 <p className="text-sm text-gray-500 dark:text-gray-400 truncate">
-                  {suggestion.brand} · {suggestion.category}
+                  {suggestion.kind === "brand"
+                    ? "Brand"
+                    : suggestion.kind === "category"
+                    ? "Category"
+                    : `${suggestion.brand} · ${suggestion.category}`}
                 </p>
               </div>
             </button>
@@ -51,6 +51,12 @@ export const api = {
     return response.data;
   },
 
+  // Get a product's price history (list responses leave it out)
+  getProductHistory: async (productId) => {
+    const response = await apiClient.get(`/products/${productId}/history`);
+    return response.data.history;
+  },
+
   // Get products by category
   getProductsByCategory: async (category, limit = 10) => {
     const response = await apiClient.get(`/products/category/${encodeURIComponent(category)}`, {